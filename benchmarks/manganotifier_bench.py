@@ -0,0 +1,130 @@
+"""Cycle-time benchmark for MangaNotifier against the local stand-in.
+
+Drives full poll cycles through the cog's own ``poll_titles``,
+``MangaClient`` and ``NotificationQueue`` with every title subscribed in
+one fake channel, and reports per cycle:
+
+* cycle duration,
+* provider requests made (as counted by the stand-in),
+* notification latency from "release" to "message sent".
+
+Run from the repository root (needs Red-DiscordBot installed)::
+
+    python -m benchmarks.manganotifier_bench --titles 1000 --cycles 3
+"""
+import argparse
+import asyncio
+import time
+from statistics import quantiles
+
+import discord
+
+from benchmarks.manganotifier_standin import add_arguments, from_arguments, title_name
+from manganotifier.httpclient import HTTPClient
+from manganotifier.manganotifier import normalize_name
+from manganotifier.notify import NotificationQueue
+from manganotifier.providers import MangaClient
+from manganotifier.scheduler import PollScheduler, poll_titles
+
+CHANNEL_ID = 1
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sends = []
+
+    async def send(self, **kwargs):
+        self.sends.append(time.time())
+
+
+class FakeBot:
+    def __init__(self):
+        self.channel = FakeChannel()
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return quantiles(values, n=100)[q - 1]
+
+
+async def run(args):
+    standin = from_arguments(args)
+    base_url = await standin.serve()
+    client = MangaClient()
+    client.mangadex_url = f"{base_url}/mangadex"
+    client.anilist_url = f"{base_url}/anilist"
+    bot = FakeBot()
+    queue = NotificationQueue(bot, delay=args.coalesce)
+    scheduler = PollScheduler(budget_per_hour=float('inf'))
+    http = HTTPClient()
+
+    titles = {}
+    for i in range(args.titles):
+        name = title_name(i)
+        title = standin.lookup(name)
+        titles[normalize_name(name)] = {
+            'name': name,
+            'last_episode': standin.latest_chapter(title),
+            'releases': [],
+        }
+
+    # (release time, queued time) for every notification of the cycle.
+    queued = []
+
+    def notify(key, name, episode, url, cover_image, description):
+        released = standin.release_time(standin.lookup(name), episode)
+        queued.append((released, time.time()))
+        embed = discord.Embed(title=f"New episode of {name}", url=url, description=description)
+        queue.put(CHANNEL_ID, embed, f"{name} - Episode {episode}")
+
+    print(f"{'cycle':>5} {'duration':>10} {'requests':>9} {'429':>5} {'errors':>7} "
+          f"{'notified':>9} {'sends':>6} {'lat p50':>8} {'lat p95':>8}")
+    try:
+        for cycle in range(1, args.cycles + 1):
+            if cycle > 1 and args.interval:
+                await asyncio.sleep(args.interval)
+            before = standin.stats.copy()
+            sends_before = len(bot.channel.sends)
+            queued.clear()
+
+            started = time.perf_counter()
+            await poll_titles(client, http, scheduler, titles, list(titles), notify)
+            duration = time.perf_counter() - started
+            await queue.join()
+
+            sends = bot.channel.sends[sends_before:]
+            latencies = []
+            for released, at in queued:
+                sent = next((t for t in sends if t >= at), None)
+                if sent is not None:
+                    latencies.append(sent - released)
+            delta = standin.stats - before
+            requests = delta['mangadex_requests'] + delta['anilist_requests']
+            print(f"{cycle:>5} {duration:>9.2f}s {requests:>9} "
+                  f"{delta['mangadex_429'] + delta['anilist_429']:>5} "
+                  f"{delta['mangadex_errors'] + delta['anilist_errors']:>7} "
+                  f"{len(queued):>9} {len(sends):>6} "
+                  f"{percentile(latencies, 50):>7.1f}s {percentile(latencies, 95):>7.1f}s")
+    finally:
+        queue.close()
+        await http.close()
+        await standin.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--interval', type=float, default=0,
+                        help="seconds to wait between cycles")
+    parser.add_argument('--coalesce', type=float, default=0.5,
+                        help="NotificationQueue coalesce delay in seconds")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
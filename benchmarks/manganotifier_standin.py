@@ -0,0 +1,192 @@
+"""Local stand-in for the MangaDex and AniList APIs used by MangaNotifier.
+
+Serves ``GET /mangadex/manga?title=...`` and ``POST /anilist`` (GraphQL)
+for a synthetic catalog of titles that release chapters on a fixed
+schedule, with configurable latency, error rate and rate limiting.
+
+Run standalone with::
+
+    python -m benchmarks.manganotifier_standin --titles 1000 --port 8765
+
+and point ``MangaClient.mangadex_url`` / ``MangaClient.anilist_url`` at
+``http://127.0.0.1:8765/mangadex`` and ``http://127.0.0.1:8765/anilist``.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+
+from aiohttp import web
+
+
+def title_name(index):
+    return f"Bench Title {index:05d}"
+
+
+class StandIn:
+    """Synthetic provider server.
+
+    Title ``i`` releases chapter ``n`` at ``start + offset_i + n * cadence_i``
+    with the cadence drawn uniformly from ``cadence`` (seconds). Every
+    response is delayed by ``latency`` +/- ``jitter`` seconds; ``error_rate``
+    of requests fail with a 500, and more than ``rate_limit`` requests per
+    second (0 disables it) are answered with a 429.
+    """
+
+    def __init__(self, titles=1000, latency=0.05, jitter=0.02, error_rate=0.0,
+                 rate_limit=0, cadence=(30, 300), seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.start = time.time()
+        self.catalog = {}
+        self.by_id = {}
+        for i in range(titles):
+            period = self.random.uniform(*cadence)
+            self.catalog[title_name(i).casefold()] = self.by_id[f"00000000-0000-0000-0000-{i:012d}"] = {
+                'id': f"00000000-0000-0000-0000-{i:012d}",
+                'index': i,
+                'name': title_name(i),
+                'cadence': period,
+                'offset': self.random.uniform(0, period),
+                'base': self.random.randint(1, 200),
+            }
+        self.stats = Counter()
+        self._recent = deque()
+        self._runner = None
+
+    def latest_chapter(self, title, now=None):
+        now = time.time() if now is None else now
+        released = int((now - self.start - title['offset']) // title['cadence'])
+        return title['base'] + max(0, released)
+
+    def release_time(self, title, chapter):
+        """Wall-clock time at which ``chapter`` of ``title`` came out."""
+        return self.start + title['offset'] + (chapter - title['base']) * title['cadence']
+
+    def lookup(self, name):
+        return self.catalog.get(" ".join(name.casefold().split()))
+
+    async def _gate(self, provider):
+        """Apply latency, rate limiting and errors; return a status or None."""
+        self.stats[f"{provider}_requests"] += 1
+        delay = max(0.0, self.random.gauss(self.latency, self.jitter))
+        await asyncio.sleep(delay)
+        if self.rate_limit:
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.stats[f"{provider}_429"] += 1
+                return 429
+            self._recent.append(now)
+        if self.random.random() < self.error_rate:
+            self.stats[f"{provider}_errors"] += 1
+            return 500
+        return None
+
+    async def mangadex_manga(self, request):
+        status = await self._gate("mangadex")
+        if status is not None:
+            return web.json_response({'result': 'error'}, status=status,
+                                     headers={'Retry-After': '1'} if status == 429 else None)
+        if 'ids[]' in request.query:
+            title = self.by_id.get(request.query['ids[]'])
+        else:
+            title = self.lookup(request.query.get('title', ''))
+        data = []
+        if title:
+            cover = {
+                'id': f"c0000000-0000-0000-0000-{title['index']:012d}",
+                'type': 'cover_art',
+            }
+            if 'cover_art' in request.query.getall('includes[]', []):
+                cover['attributes'] = {'fileName': f"{title['index']}.jpg"}
+            data.append({
+                'id': title['id'],
+                'type': 'manga',
+                'attributes': {
+                    'title': {'en': title['name']},
+                    'description': {'en': f"Synthetic description for {title['name']}."},
+                    'latestChapter': str(self.latest_chapter(title)),
+                    'updatedAt': "2024-01-01T00:00:00+00:00",
+                },
+                'relationships': [cover],
+            })
+        return web.json_response({'result': 'ok', 'data': data, 'total': len(data)})
+
+    async def anilist(self, request):
+        status = await self._gate("anilist")
+        if status is not None:
+            return web.json_response({'errors': [{'status': status}]}, status=status)
+        payload = await request.json()
+        title = self.lookup(payload.get('variables', {}).get('search', ''))
+        if title is None:
+            return web.json_response(
+                {'data': {'Media': None}, 'errors': [{'status': 404}]}, status=404)
+        return web.json_response({'data': {'Media': {
+            'id': title['index'],
+            'chapters': self.latest_chapter(title),
+        }}})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/mangadex/manga', self.mangadex_manga)
+        app.router.add_post('/anilist', self.anilist)
+        return app
+
+    async def serve(self, host='127.0.0.1', port=0):
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def add_arguments(parser):
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="mean response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help="requests per second before answering 429 (0 = off)")
+    parser.add_argument('--cadence', type=float, nargs=2, default=(30, 300),
+                        metavar=('MIN', 'MAX'), help="release cadence range in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def from_arguments(args):
+    return StandIn(titles=args.titles, latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate, rate_limit=args.rate_limit,
+                   cadence=tuple(args.cadence), seed=args.seed)
+
+
+async def _main(args):
+    standin = from_arguments(args)
+    base_url = await standin.serve(args.host, args.port)
+    print(f"Serving {args.titles} titles on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standin.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
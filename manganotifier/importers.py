@@ -0,0 +1,83 @@
+import gzip
+import io
+import json
+import xml.etree.ElementTree as ET
+
+# MAL manga exports use <manga_title>; anime exports use <series_title>.
+MAL_TITLE_TAGS = ('manga_title', 'series_title')
+ANILIST_TITLE_KEYS = ('english', 'romaji', 'userPreferred', 'native')
+# Upper bound for a decompressed export; real lists stay far below it.
+MAX_DECOMPRESSED_SIZE = 32 * 1024 ** 2
+
+
+class ExportFormatError(ValueError):
+    """Raised when an uploaded file is not a supported list export."""
+
+
+def parse_export(data):
+    """Return the manga titles in a MAL XML or AniList JSON export.
+
+    ``data`` is the raw file content; gzip-compressed MAL exports are
+    accepted as well. Titles are returned in file order, duplicates
+    included.
+    """
+    if data[:2] == b'\x1f\x8b':
+        data = decompress(data)
+    head = data.lstrip()[:1]
+    if head == b'<':
+        return list(iter_mal_titles(io.BytesIO(data)))
+    if head in (b'{', b'['):
+        try:
+            return list(iter_anilist_titles(json.loads(data)))
+        except ValueError as e:
+            raise ExportFormatError(f"Invalid JSON: {e}") from e
+    raise ExportFormatError("Expected a MyAnimeList XML or AniList JSON export.")
+
+
+def decompress(data, max_size=MAX_DECOMPRESSED_SIZE):
+    """Gunzip ``data``, refusing output larger than ``max_size`` bytes."""
+    try:
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            data = f.read(max_size + 1)
+    except (OSError, EOFError) as e:
+        raise ExportFormatError(f"Invalid gzip file: {e}") from e
+    if len(data) > max_size:
+        raise ExportFormatError(f"The export is too large once decompressed (max {max_size // 1024 ** 2} MiB).")
+    return data
+
+
+def iter_mal_titles(stream):
+    """Yield titles from a MAL export without building the whole tree."""
+    try:
+        for _, element in ET.iterparse(stream, events=('end',)):
+            if element.tag in MAL_TITLE_TAGS:
+                if element.text and element.text.strip():
+                    yield element.text.strip()
+            elif element.tag in ('manga', 'anime'):
+                # Entries are independent; drop them once read.
+                element.clear()
+    except ET.ParseError as e:
+        raise ExportFormatError(f"Invalid XML: {e}") from e
+
+
+def iter_anilist_titles(data):
+    """Yield titles from an AniList list export.
+
+    Accepts the ``MediaListCollection``/``lists``/``entries`` layout of the
+    API and common export tools, or a plain list of entries. An entry's
+    title is read from ``media.title`` (or ``title``), preferring English.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            media = node.get('media') if isinstance(node.get('media'), dict) else node
+            title = media.get('title')
+            if isinstance(title, dict):
+                title = next((title[k] for k in ANILIST_TITLE_KEYS if title.get(k)), None)
+            if isinstance(title, str) and title.strip():
+                yield title.strip()
+                continue
+            stack.extend(reversed([v for v in node.values() if isinstance(v, (dict, list))]))
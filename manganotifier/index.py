@@ -0,0 +1,120 @@
+import time
+from collections import defaultdict
+
+from .providers import normalize_name
+
+# How long fetched title details may be served without a network call.
+INFO_TTL = 60 * 60
+
+
+def trigrams(text):
+    text = f"  {normalize_name(text)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TitleIndex:
+    """Trigram index over tracked titles and their alternate names.
+
+    Besides fuzzy lookups, it holds the last fetched details of every
+    title so ``info`` can answer without asking a provider while they are
+    fresh.
+    """
+
+    def __init__(self):
+        # trigram -> set of (key, name)
+        self._grams = defaultdict(set)
+        # key -> set of indexed names
+        self._names = {}
+        # key -> display name
+        self._titles = {}
+        # key -> (fetched_at, manga_update)
+        self._details = {}
+
+    def __contains__(self, key):
+        return key in self._names
+
+    def add(self, key, names):
+        """Index ``key`` under every name in ``names``.
+
+        The first name is the one shown for ``key``.
+        """
+        if names:
+            self._titles[key] = names[0]
+        indexed = self._names.setdefault(key, set())
+        for name in names:
+            if not name or name in indexed:
+                continue
+            indexed.add(name)
+            for gram in trigrams(name):
+                self._grams[gram].add((key, name))
+
+    def remove(self, key):
+        for name in self._names.pop(key, ()):
+            for gram in trigrams(name):
+                entries = self._grams.get(gram)
+                if entries is not None:
+                    entries.discard((key, name))
+                    if not entries:
+                        del self._grams[gram]
+        self._titles.pop(key, None)
+        self._details.pop(key, None)
+
+    def titles(self, keys=None, limit=25):
+        """Return up to ``limit`` display names in alphabetical order."""
+        names = (name for key, name in self._titles.items() if keys is None or key in keys)
+        return sorted(names, key=str.casefold)[:limit]
+
+    def set_details(self, key, manga_update, now=None):
+        self._details[key] = (time.time() if now is None else now, manga_update)
+
+    def details(self, key, max_age=INFO_TTL):
+        """Return the cached details of ``key`` if younger than ``max_age``."""
+        fetched_at, manga_update = self._details.get(key, (0, None))
+        if time.time() - fetched_at > max_age:
+            return None
+        return manga_update
+
+    def search(self, query, limit=25, keys=None):
+        """Return up to ``limit`` ``(key, name, score)`` matches for ``query``.
+
+        Scores are the trigram similarity of the best matching name of each
+        title, boosted for prefix matches. ``keys`` restricts the search to
+        a subset of titles.
+        """
+        ranked = sorted(self._match(query, keys).items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, name, score) for key, (score, _, name) in ranked[:limit]]
+
+    def _match(self, query, keys=None):
+        """Return ``key -> (score, similarity, name)`` for the best name of each title."""
+        query_grams = trigrams(query)
+        normalized = normalize_name(query)
+        hits = defaultdict(int)
+        for gram in query_grams:
+            for entry in self._grams.get(gram, ()):
+                if keys is None or entry[0] in keys:
+                    hits[entry] += 1
+        best = {}
+        for (key, name), shared in hits.items():
+            similarity = shared / len(query_grams | trigrams(name))
+            score = similarity
+            if normalize_name(name).startswith(normalized):
+                score += 1
+            if score > best.get(key, (0,))[0]:
+                best[key] = (score, similarity, name)
+        return best
+
+    def resolve(self, query, keys=None, threshold=0.5):
+        """Return the key ``query`` refers to, exactly or by a close match.
+
+        Only the trigram similarity counts towards ``threshold``; a bare
+        prefix such as "a" or "One" doesn't pick a title on its own.
+        """
+        key = normalize_name(query)
+        if key in self._names and (keys is None or key in keys):
+            return key
+        matches = self._match(query, keys)
+        if matches:
+            key, (_, similarity, _) = max(matches.items(), key=lambda item: item[1][1])
+            if similarity >= threshold:
+                return key
+        return None
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+log = logging.getLogger("red.imnic-cogs.manganotifier.jobs")
+
+# Default spread of each run around its slot, as a fraction of the interval.
+DEFAULT_JITTER = 0.1
+
+
+class JobStats:
+    """Run counters of one job."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        # Cycles not run because of backpressure or an overrun.
+        self.skipped = 0
+        # Runs that took longer than the interval.
+        self.overruns = 0
+        self.last_started: Optional[float] = None
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+
+class Job:
+    """A coroutine function run every ``interval`` seconds by a ``JobSupervisor``.
+
+    The first run starts after a random delay of up to ``start_jitter``
+    seconds (one interval by default) so jobs of several cogs don't all
+    fire right after a restart; later runs keep to their slots with up to
+    ``jitter`` of the interval added or subtracted. When ``skip_if``
+    returns true the cycle is skipped. A run that overruns its interval is
+    not followed by catch-up runs; the missed slots are skipped instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        interval: float,
+        *,
+        jitter: float = DEFAULT_JITTER,
+        start_jitter: Optional[float] = None,
+        skip_if: Optional[Callable[[], bool]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.start_jitter = interval if start_jitter is None else start_jitter
+        self.skip_if = skip_if
+        self.stats = JobStats()
+        self.task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def set_interval(self, interval: float):
+        """Change the interval; a pending wait is recomputed right away."""
+        self.interval = interval
+        self._wake.set()
+
+    async def _sleep_until(self, deadline):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            delay = deadline() - loop.time()
+            if delay <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                return
+
+    async def _run_once(self):
+        stats = self.stats
+        if self.skip_if is not None and self.skip_if():
+            stats.skipped += 1
+            log.info("Skipping %s: backpressure", self.name)
+            return
+        stats.last_started = time.time()
+        started = time.perf_counter()
+        try:
+            await self.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.failures += 1
+            log.exception("Job %s failed", self.name)
+        duration = time.perf_counter() - started
+        stats.runs += 1
+        stats.last_duration = duration
+        stats.max_duration = max(stats.max_duration, duration)
+        if duration > self.interval:
+            stats.overruns += 1
+            log.warning("Job %s took %.1fs, longer than its %.0fs interval",
+                        self.name, duration, self.interval)
+
+    async def _loop(self, ready):
+        loop = asyncio.get_running_loop()
+        await ready()
+        first = loop.time() + random.uniform(0, self.start_jitter)
+        await self._sleep_until(lambda: first)
+        while True:
+            slot = loop.time()
+            await self._run_once()
+            offset = random.uniform(-self.jitter, self.jitter)
+            overdue = loop.time() - (slot + self.interval * (1 + offset))
+            if overdue > 0:
+                self.stats.skipped += int(overdue // self.interval) + 1
+
+            def deadline():
+                # Re-read the interval so set_interval() applies while waiting.
+                next_run = slot + self.interval * (1 + offset)
+                now = loop.time()
+                if next_run < now:
+                    next_run += ((now - next_run) // self.interval + 1) * self.interval
+                return next_run
+
+            await self._sleep_until(deadline)
+
+
+class JobSupervisor:
+    """Runs the periodic jobs of a cog, at most one instance of each.
+
+    Jobs wait for ``ready`` (e.g. ``bot.wait_until_red_ready``) before
+    their first run. ``start`` may be called again at any time; jobs that
+    are still running are left alone, so a reconnect never stacks loops.
+    """
+
+    def __init__(self, ready: Callable[[], Awaitable[None]]):
+        self.ready = ready
+        self.jobs: Dict[str, Job] = {}
+
+    def add(self, name, func, interval, **kwargs) -> Job:
+        job = self.jobs[name] = Job(name, func, interval, **kwargs)
+        return job
+
+    def start(self):
+        for job in self.jobs.values():
+            if not job.running:
+                job.task = asyncio.ensure_future(job._loop(self.ready))
+
+    async def close(self):
+        """Cancel all jobs and wait until they have stopped."""
+        tasks = [job.task for job in self.jobs.values() if job.running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,9 +1,31 @@
 """WORK IN PROGRESS"""
 import discord
-from discord.ext import tasks
+from discord import app_commands
 from redbot.core import commands, Config
 from redbot.core.bot import Red
-import aiohttp
+from redbot.core.data_manager import cog_data_path
+import asyncio
+import io
+import time
+from typing import Optional
+
+from .httpclient import HTTPClient
+from .index import TitleIndex
+from .importers import ExportFormatError, parse_export
+from .jobs import JobSupervisor
+from .metrics import CycleStats
+from .notify import MAX_DESCRIPTION, MAX_TITLE, NotificationQueue, shorten
+from .providers import MangaClient, normalize_name
+from .scheduler import DEFAULT_INTERVAL, PollScheduler, next_interval, poll_titles
+from .store import StateStore
+
+
+# Resolve at most this many titles concurrently during an import.
+IMPORT_CONCURRENCY = 5
+MAX_IMPORT_SIZE = 8 * 1024 ** 2
+POLL_INTERVAL = 60
+# Skip poll cycles while this many notifications are still waiting to be sent.
+MAX_PENDING_NOTIFICATIONS = 500
 
 
 class MangaNotifier(commands.Cog):
@@ -13,200 +35,443 @@ class MangaNotifier(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(
             self, identifier=7852384562, force_registration=True)
-        self.config.register_global(manga_list=[], channel_id=None)
-        self.manga_check_loop.start()
+        # Config only holds user settings. The deduplicated set of tracked
+        # titles shared by all guilds, their polling state and cached
+        # metadata live in the SQLite StateStore, keyed by
+        # normalize_name(name). ``titles``, ``metadata``, ``manga_list`` and
+        # the global ``channel_id`` are legacy settings only read for
+        # migration.
+        self.config.register_global(
+            titles={}, metadata={}, manga_list=[], channel_id=None,
+            requests_per_hour=120)
+        # ``subscriptions`` maps a title key -> channel ID, or None to use
+        # the guild's default ``channel_id``.
+        self.config.register_guild(channel_id=None, subscriptions={})
+        self.store = StateStore(str(cog_data_path(self) / "state.sqlite3"))
+        self.scheduler = PollScheduler()
+        self.notifications = NotificationQueue(bot)
+        self.client = MangaClient()
+        self.http = HTTPClient()
+        self.last_cycle = None
+        self.index = TitleIndex()
+        # title key -> {guild_id: channel_id or None}
+        self.subscribers = {}
+        # guild_id -> default notification channel ID
+        self.guild_channels = {}
+        self._startup_task = None
+        self.jobs = JobSupervisor(bot.wait_until_red_ready)
+        self.poll_job = self.jobs.add(
+            "manganotifier.poll", self.manga_check, POLL_INTERVAL,
+            skip_if=lambda: self.notifications.pending > MAX_PENDING_NOTIFICATIONS)
 
     async def initialize(self):
-        pass
+        await self.store.open()
+        await self.migrate_manga_list()
+        await self.migrate_config_state()
+        self.scheduler.budget_per_hour = await self.config.requests_per_hour()
+        self.client.metadata = await self.store.load_metadata()
+        for key, name in (await self.store.names()).items():
+            self.index_title(key, name)
+        self._startup_task = asyncio.create_task(self._startup())
 
-    @tasks.loop(minutes=30)
-    async def manga_check_loop(self):
-        async with aiohttp.ClientSession() as session:
-            manga_list = await self.config.manga_list()
-            for manga in manga_list:
-                manga_update = await self.check_mangadex(session, manga['name'])
-                if not manga_update:
-                    manga_update = await self.check_fallback_api(session, manga['name'])
+    async def _startup(self):
+        # The legacy channel migration needs the channel cache.
+        await self.bot.wait_until_red_ready()
+        await self.migrate_global_channel()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            self.guild_channels[guild_id] = data['channel_id']
+            for key, channel_id in data['subscriptions'].items():
+                self.subscribers.setdefault(key, {})[guild_id] = channel_id
+        now = time.time()
+        for key, next_check in await self.store.schedule():
+            if key in self.subscribers:
+                self.scheduler.schedule(key, next_check or now)
+        self.jobs.start()
 
-                if manga_update:
-                    latest_episode = manga_update.get('latest_episode', 0)
-                    if latest_episode > manga['last_episode']:
-                        await self.notify_new_episode(manga['name'], latest_episode, manga_update['url'], manga_update.get('cover_image'), manga_update.get('description'))
-                        manga['last_episode'] = latest_episode
-                        await self.config.manga_list.set(manga_list)
-
-    async def check_mangadex(self, session, manga_name):
-        url = f"https://api.mangadex.org/manga?title={manga_name}"
+    async def migrate_manga_list(self):
+        """Move entries from the legacy ``manga_list`` into the store."""
+        manga_list = await self.config.manga_list()
+        if not manga_list:
+            return
+        await self.store.save_titles({
+            normalize_name(manga['name']): {
+                'name': manga['name'],
+                'last_episode': manga.get('last_episode', 0),
+            }
+            for manga in manga_list
+        }, replace=False)
+        await self.config.manga_list.clear()
+
+    async def migrate_config_state(self):
+        """Move titles and metadata kept in Config into the store."""
+        titles = await self.config.titles()
+        if titles:
+            await self.store.save_titles(titles, replace=False)
+            await self.config.titles.clear()
+        metadata = await self.config.metadata()
+        if metadata:
+            await self.store.save_metadata(metadata)
+            await self.config.metadata.clear()
+
+    async def migrate_global_channel(self):
+        """Subscribe the legacy global channel's guild to every title."""
+        channel_id = await self.config.channel_id()
+        if channel_id is None:
+            return
+        channel = self.bot.get_channel(channel_id)
+        if channel is not None:
+            guild_config = self.config.guild(channel.guild)
+            await guild_config.channel_id.set(channel_id)
+            async with guild_config.subscriptions() as subscriptions:
+                for key in await self.store.names():
+                    subscriptions.setdefault(key, None)
+        await self.config.channel_id.clear()
+
+    async def manga_check(self):
+        due = self.scheduler.pop_due()
+        if not due:
+            return
+        titles = await self.store.get_titles(due)
+        changed = {}
+        cycle = CycleStats()
+        sent = self.requests_sent()
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data and 'data' in data:
-                        manga_data = data['data']
-                        if manga_data:
-                            print(f"MangaDex response data: {manga_data}")
-                            latest_chapter = None
-                            cover_image = None
-                            description = None
-                            for manga in manga_data:
-                                if 'attributes' in manga:
-                                    latest_chapter = manga['attributes'].get(
-                                        'latestChapter', '')
-                                    cover_art_relationship = next(
-                                        (rel for rel in manga['relationships'] if rel['type'] == 'cover_art'), None)
-                                    if cover_art_relationship:
-                                        cover_image_id = cover_art_relationship['id']
-                                        cover_image = f"https://og.mangadex.org/og-image/manga/{cover_image_id}"
-                                    description = manga['attributes'].get(
-                                        'description', {}).get('en', 'No description available.')
-                                    url = f"https://mangadex.org/title/{manga['id']}"
-                                    break
-                            if latest_chapter and latest_chapter.isdigit():
-                                return {
-                                    'latest_episode': int(latest_chapter),
-                                    'cover_image': cover_image,
-                                    'description': description,
-                                    'url': url
-                                }
-                            else:
-                                print(
-                                    f"No valid latestChapter found for {manga_name}")
-                    else:
-                        print(
-                            f"MangaDex response data not found or malformed: {data}")
-                else:
-                    print(
-                        f"Failed to fetch from MangaDex: HTTP {response.status}")
-        except aiohttp.ClientConnectorError as e:
-            print(f"MangaDex API connection error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        return None
-
-    async def check_fallback_api(self, session, manga_name):
-        query = """
-        query ($search: String) {
-          Media(search: $search, type: MANGA) {
-            id
-            chapters
-          }
-        }
+            changed = await poll_titles(
+                self.client, self.http, self.scheduler, titles, due,
+                self.notify_new_episode, cycle.timings, self.index)
+        finally:
+            cycle.duration = time.time() - cycle.started
+            self.last_cycle = cycle
+            self.scheduler.charge(self.requests_sent() - sent)
+            # Titles we didn't get to (e.g. a send failed) go back in the queue.
+            for key in due:
+                if key in self.subscribers and key not in self.scheduler:
+                    self.scheduler.schedule(key, time.time() + DEFAULT_INTERVAL)
+
+        # Commit the whole cycle in one transaction; titles removed while we
+        # were polling are skipped by the UPDATE.
+        await self.store.update_polled(changed)
+        await self.save_metadata()
+
+    def requests_sent(self):
+        """Total HTTP requests sent so far, retries included."""
+        return sum(m.requests for m in self.http.metrics.values())
+
+    async def save_metadata(self):
+        dirty, self.client.metadata_dirty = self.client.metadata_dirty, set()
+        metadata = {key: self.client.metadata[key] for key in dirty if key in self.client.metadata}
+        if metadata:
+            await self.store.save_metadata(metadata)
+
+    def subscribed_channels(self, key):
+        """Return the set of channel IDs subscribed to ``key``."""
+        channels = set()
+        for guild_id, channel_id in self.subscribers.get(key, {}).items():
+            channel_id = channel_id or self.guild_channels.get(guild_id)
+            if channel_id:
+                channels.add(channel_id)
+        return channels
+
+    def notify_new_episode(self, key, manga_name, episode, url, cover_image, description):
+        """Queue a new episode notification for every subscribed channel.
+
+        The queue coalesces notifications per channel, see NotificationQueue.
         """
-        variables = {'search': manga_name}
-        url = 'https://graphql.anilist.co'
-        try:
-            async with session.post(url, json={'query': query, 'variables': variables}) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data and 'data' in data and 'Media' in data['data']:
-                        media_data = data['data']['Media']
-                        print(f"AniList response data: {media_data}")
-                        chapters = media_data.get('chapters', 0)
-                        if chapters:
-                            return {'latest_episode': chapters}
-                        else:
-                            print(
-                                f"No chapters found for {manga_name} in AniList response")
-                    else:
-                        print(
-                            f"AniList response data not found or malformed: {data}")
-                else:
-                    print(
-                        f"Failed to fetch from AniList: HTTP {response.status}")
-        except aiohttp.ClientConnectorError as e:
-            print(f"AniList API connection error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        return None
-
-    async def notify_new_episode(self, manga_name, episode, url, cover_image, description):
-        channel_id = await self.config.channel_id()
-        if channel_id:
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                embed = discord.Embed(
-                    title=f"New episode of {manga_name}",
-                    description=description,
-                    url=url,
-                    color=discord.Color.blue()
-                )
-                if cover_image:
-                    embed.set_image(url=cover_image)
-                embed.add_field(name="Latest Episode",
-                                value=f"Episode {episode}", inline=True)
-                embed.set_footer(text="MangaNotifier")
-                await channel.send(embed=embed)
-            else:
-                print(f"Channel ID {channel_id} not found.")
+        channels = self.subscribed_channels(key)
+        if not channels:
+            return
+        embed = discord.Embed(
+            title=shorten(f"New episode of {manga_name}", MAX_TITLE),
+            description=shorten(description, MAX_DESCRIPTION),
+            url=url,
+            color=discord.Color.blue()
+        )
+        if cover_image:
+            embed.set_image(url=cover_image)
+        embed.add_field(name="Latest Episode",
+                        value=f"Episode {episode}", inline=True)
+        embed.set_footer(text="MangaNotifier")
+        line = f"[{manga_name}]({url}) \N{EM DASH} Episode {episode}"
+        for channel_id in channels:
+            self.notifications.put(channel_id, embed, line)
+
+    async def find_duplicate(self, key, claimed=None):
+        """Return the key of another title ``key`` resolved to, if any.
+
+        Different names can resolve to the same MangaDex manga. The
+        duplicate's freshly fetched metadata is dropped so only one title
+        is stored and polled. ``claimed`` maps MangaDex IDs to the keys
+        taken earlier in the same batch.
+        """
+        mangadex_id = (self.client.cached_metadata(key) or {}).get('id')
+        if mangadex_id is None:
+            return None
+        existing = await self.store.find_by_mangadex_id(mangadex_id)
+        if existing is None and claimed is not None:
+            existing = claimed.setdefault(mangadex_id, key)
+        if existing is None or existing == key:
+            return None
+        self.client.forget(key)
+        return existing
+
+    async def subscribe(self, guild, key, channel_id=None):
+        await self.config.guild(guild).subscriptions.set_raw(key, value=channel_id)
+        self.subscribers.setdefault(key, {})[guild.id] = channel_id
+
+    async def unsubscribe(self, guild, key):
+        """Drop ``guild``'s subscription and forget titles nobody follows."""
+        await self.config.guild(guild).subscriptions.clear_raw(key)
+        guilds = self.subscribers.get(key, {})
+        guilds.pop(guild.id, None)
+        if not guilds:
+            self.subscribers.pop(key, None)
+            self.scheduler.discard(key)
+            self.index.remove(key)
+            self.client.forget(key)
+            await self.store.delete_title(key)
+
+    def index_title(self, key, name, manga_update=None):
+        self.index.add(key, [name, *self.client.metadata.get(key, {}).get('alt_titles', [])])
+        if manga_update:
+            self.index.set_details(key, manga_update)
+
+    def autocomplete_choices(self, current, keys=None):
+        if current.strip():
+            matches = [name for _, name, _ in self.index.search(current, keys=keys)]
         else:
-            print("Notification channel not set.")
+            matches = self.index.titles(keys)
+        return [app_commands.Choice(name=name[:100], value=name[:100]) for name in matches]
 
-    @commands.group()
+    @commands.hybrid_group()
+    @commands.guild_only()
     async def manganotifier(self, ctx):
         """Manage your manga list"""
         if ctx.invoked_subcommand is None:
             await ctx.send_help(ctx.command)
 
-    @manganotifier.command(name="add")
-    async def add(self, ctx, *, name: str):
-        """Add a manga to the list and fetch its details"""
-        manga_list = await self.config.manga_list()
-        if any(m['name'].lower() == name.lower() for m in manga_list):
+    # Prefix-only: a slash command can't take the required name after the
+    # optional channel, and the name has to stay last to allow spaces.
+    @manganotifier.command(name="add", with_app_command=False)
+    async def add(self, ctx, channel: Optional[discord.TextChannel] = None, *, name: str):
+        """Add a manga to the list and fetch its details
+
+        Notifications go to the server's notification channel unless a
+        channel is given.
+        """
+        await ctx.defer()
+        key = normalize_name(name)
+        channel_id = channel.id if channel else None
+        subscriptions = await self.config.guild(ctx.guild).subscriptions()
+        if subscriptions.get(key, ...) == channel_id:
             await ctx.send(f"{name} is already in the list.")
             return
 
-        async with aiohttp.ClientSession() as session:
-            manga_update = await self.check_mangadex(session, name)
+        manga = await self.store.get_title(key)
+        if manga is None:
+            manga_update = await self.client.fetch_manga(self.http, name)
             if not manga_update:
-                manga_update = await self.check_fallback_api(session, name)
-            if manga_update:
-                manga_list.append(
-                    {'name': name, 'last_episode': manga_update['latest_episode']})
-                await self.config.manga_list.set(manga_list)
-                embed = discord.Embed(
-                    title="Manga Added",
-                    description=f"Added {name} to the list with the latest episode {manga_update['latest_episode']}.",
-                    color=discord.Color.green()
-                )
-                if manga_update.get('cover_image'):
-                    embed.set_image(url=manga_update['cover_image'])
-                await ctx.send(embed=embed)
-            else:
                 await ctx.send(f"Failed to fetch details for {name}.")
+                return
+            existing = await self.find_duplicate(key)
+            if existing is not None:
+                # Another name for a title that is already tracked.
+                key = existing
+                manga = await self.store.get_title(key)
+                if subscriptions.get(key, ...) == channel_id:
+                    await ctx.send(f"{name} is already in the list as {manga['name']}.")
+                    return
+
+        if manga is not None:
+            # Another server already tracks this title; just subscribe.
+            await self.subscribe(ctx.guild, key, channel_id)
+            if key not in self.scheduler:
+                # Titles nobody was subscribed to aren't scheduled at startup.
+                self.scheduler.schedule(key, manga['next_check'] or time.time())
+            await ctx.send(embed=discord.Embed(
+                title="Manga Added",
+                description=f"Added {manga['name']} to the list with the latest episode {manga['last_episode']}.",
+                color=discord.Color.green()
+            ))
+            return
+
+        now = time.time()
+        next_check = now + next_interval({'added': now}, now)
+        await self.store.save_titles({key: {
+            'name': name,
+            'last_episode': manga_update['latest_episode'],
+            'next_check': next_check,
+            'added': now,
+        }})
+        self.client.track(key)
+        await self.save_metadata()
+        await self.subscribe(ctx.guild, key, channel_id)
+        self.scheduler.schedule(key, next_check)
+        self.index_title(key, name, manga_update)
+        embed = discord.Embed(
+            title="Manga Added",
+            description=f"Added {name} to the list with the latest episode {manga_update['latest_episode']}.",
+            color=discord.Color.green()
+        )
+        if manga_update.get('cover_image'):
+            embed.set_image(url=manga_update['cover_image'])
+        await ctx.send(embed=embed)
+
+    @manganotifier.command(name="import", with_app_command=False)
+    @commands.admin_or_permissions(manage_guild=True)
+    async def import_list(self, ctx, channel: Optional[discord.TextChannel] = None):
+        """Import mangas from an attached MyAnimeList XML or AniList JSON export
+
+        Titles are resolved a few at a time and added in one go; a report
+        with the result for every title is attached to the reply.
+        """
+        if not ctx.message.attachments:
+            await ctx.send("Attach a MyAnimeList XML or AniList JSON export to the command.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > MAX_IMPORT_SIZE:
+            await ctx.send(f"The export is too large (max {MAX_IMPORT_SIZE // 1024 ** 2} MiB).")
+            return
+        try:
+            data = await attachment.read()
+            names = await asyncio.get_running_loop().run_in_executor(None, parse_export, data)
+        except ExportFormatError as e:
+            await ctx.send(f"Could not read the export: {e}")
+            return
+
+        channel_id = channel.id if channel else None
+        subscriptions = await self.config.guild(ctx.guild).subscriptions()
+        titles = await self.store.get_titles({normalize_name(name) for name in names})
+        report = {}
+        to_add = {}
+        to_resolve = {}
+        for name in names:
+            key = normalize_name(name)
+            if key in report or key in to_resolve:
+                continue
+            if subscriptions.get(key, ...) == channel_id:
+                report[key] = f"{name}: already in the list"
+            elif key in titles:
+                to_add[key] = titles[key]
+                report[key] = f"{name}: added (episode {titles[key]['last_episode']})"
+            else:
+                to_resolve[key] = name
+
+        async with ctx.typing():
+            semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+            async def resolve(key, name):
+                async with semaphore:
+                    manga_update = await self.client.fetch_manga(self.http, name)
+                if manga_update:
+                    now = time.time()
+                    to_add[key] = {
+                        'name': name,
+                        'last_episode': manga_update['latest_episode'],
+                        'next_check': now + next_interval({'added': now}, now),
+                        'added': now,
+                    }
+                    report[key] = f"{name}: added (episode {manga_update['latest_episode']})"
+                else:
+                    report[key] = f"{name}: not found"
+
+            await asyncio.gather(*(resolve(key, name) for key, name in to_resolve.items()))
+
+        # Names that resolved to a title tracked already, or to one added
+        # earlier in this import, follow that title instead.
+        claimed = {}
+        for key, name in to_resolve.items():
+            if key not in to_add:
+                continue
+            existing = await self.find_duplicate(key, claimed)
+            if existing is None:
+                continue
+            del to_add[key]
+            manga = to_add.get(existing) or await self.store.get_title(existing)
+            if subscriptions.get(existing, ...) == channel_id:
+                report[key] = f"{name}: already in the list as {manga['name']}"
+            else:
+                to_add[existing] = manga
+                report[key] = f"{name}: added as {manga['name']} (episode {manga['last_episode']})"
+
+        if to_add:
+            await self.store.save_titles(to_add, replace=False)
+            for key in to_add:
+                self.client.track(key)
+            await self.save_metadata()
+            async with self.config.guild(ctx.guild).subscriptions() as current:
+                for key in to_add:
+                    current[key] = channel_id
+            for key, manga in to_add.items():
+                self.subscribers.setdefault(key, {})[ctx.guild.id] = channel_id
+                if key not in self.scheduler:
+                    self.scheduler.schedule(key, manga['next_check'] or time.time())
+                self.index_title(key, manga['name'])
+
+        embed = discord.Embed(
+            title="Manga Import",
+            description=(
+                f"Added {len(to_add)} of {len(report)} titles "
+                f"({sum(1 for line in report.values() if line.endswith('not found'))} not found)."
+            ),
+            color=discord.Color.green() if to_add else discord.Color.red()
+        )
+        file = discord.File(
+            io.BytesIO("\n".join(report.values()).encode()), filename="import-report.txt")
+        await ctx.send(embed=embed, file=file)
 
     @manganotifier.command(name="remove")
     async def remove(self, ctx, *, name: str):
         """Remove a manga from the list"""
-        manga_list = await self.config.manga_list()
-        manga_list = [m for m in manga_list if m['name'].lower()
-                      != name.lower()]
-        await self.config.manga_list.set(manga_list)
+        subscriptions = await self.config.guild(ctx.guild).subscriptions()
+        key = self.index.resolve(name, keys=subscriptions)
+        if key is None:
+            key = normalize_name(name)
+        if key not in subscriptions:
+            await ctx.send(f"{name} is not in the list.")
+            return
+        manga = await self.store.get_title(key)
+        title = manga['name'] if manga else name
+        await self.unsubscribe(ctx.guild, key)
         embed = discord.Embed(
 
             title="Manga Removed",
-            description=f"Removed {name} from the list.",
+            description=f"Removed {title} from the list.",
             color=discord.Color.red()
         )
         await ctx.send(embed=embed)
 
+    @remove.autocomplete("name")
+    async def remove_autocomplete(self, interaction: discord.Interaction, current: str):
+        subscriptions = await self.config.guild(interaction.guild).subscriptions()
+        return self.autocomplete_choices(current, keys=subscriptions)
+
     @manganotifier.command(name="list")
     async def list(self, ctx):
         """List all mangas"""
-        manga_list = await self.config.manga_list()
-        if not manga_list:
+        subscriptions = await self.config.guild(ctx.guild).subscriptions()
+        if not subscriptions:
             await ctx.send("The manga list is empty.")
             return
+        titles = await self.store.get_titles(subscriptions)
+        lines = []
+        for key, channel_id in subscriptions.items():
+            line = titles.get(key, {}).get('name', key)
+            if channel_id:
+                line += f" (<#{channel_id}>)"
+            lines.append(line)
         embed = discord.Embed(
             title="Manga List",
-            description="\n".join(m['name'] for m in manga_list),
+            description="\n".join(lines),
             color=discord.Color.blue()
         )
         await ctx.send(embed=embed)
 
     @manganotifier.command(name="setchannel")
+    @commands.admin_or_permissions(manage_guild=True)
     async def setchannel(self, ctx, channel: discord.TextChannel):
         """Set the notification channel"""
-        await self.config.channel_id.set(channel.id)
+        await self.config.guild(ctx.guild).channel_id.set(channel.id)
+        self.guild_channels[ctx.guild.id] = channel.id
         embed = discord.Embed(
             title="Notification Channel Set",
             description=f"Notification channel set to {channel.mention}",
@@ -214,27 +479,101 @@ class MangaNotifier(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    @manganotifier.command(name="budget")
+    @commands.is_owner()
+    async def budget(self, ctx, requests_per_hour: int):
+        """Set how many provider requests polling may send per hour"""
+        if requests_per_hour < 1:
+            await ctx.send("The budget must be at least 1 request per hour.")
+            return
+        await self.config.requests_per_hour.set(requests_per_hour)
+        self.scheduler.budget_per_hour = requests_per_hour
+        await ctx.send(f"Polling budget set to {requests_per_hour} requests per hour.")
+
+    @manganotifier.command(name="stats")
+    @commands.is_owner()
+    async def stats(self, ctx):
+        """Show provider metrics and the last poll cycle"""
+        embed = discord.Embed(title="MangaNotifier Stats", color=discord.Color.blue())
+        for name, metrics in self.client.metrics.items():
+            breaker = getattr(self.client, f"{name.lower()}_breaker")
+            embed.add_field(
+                name=name + (" (circuit open)" if breaker.is_open else ""),
+                value=(
+                    f"Requests: {metrics.requests}\n"
+                    f"Failures: {metrics.failures} ({metrics.rate_limited} rate limited)\n"
+                    f"Received: {metrics.bytes / 1024:.1f} KiB\n"
+                    f"Latency: avg {metrics.latency.mean * 1000:.0f} ms, "
+                    f"p95 \N{LESS-THAN OR EQUAL TO} {metrics.latency.quantile(0.95) * 1000:.0f} ms\n"
+                    f"Parse time: avg {metrics.parse_time.mean * 1000:.1f} ms"
+                ),
+                inline=True,
+            )
+        hosts = "\n".join(
+            f"{host}: {m.requests} requests, {m.retries} retries, {m.failures} failed, "
+            f"avg {m.mean_time * 1000:.0f} ms"
+            for host, m in sorted(self.http.metrics.items())
+        )
+        embed.add_field(name="HTTP Hosts", value=hosts or "No requests yet.", inline=False)
+        cycle = self.last_cycle
+        job = self.poll_job.stats
+        if cycle is None:
+            embed.add_field(name="Last Cycle", value="No cycle has run yet.", inline=False)
+        else:
+            slowest = "\n".join(
+                f"{name}: {seconds:.2f}s" for name, seconds in cycle.slowest()) or "None"
+            embed.add_field(
+                name="Last Cycle",
+                value=(
+                    f"Started <t:{int(cycle.started)}:R>, took {cycle.duration:.2f}s "
+                    f"for {len(cycle.timings)} titles\n"
+                    f"{job.runs} cycles run, {job.skipped} skipped, {job.overruns} overran\n"
+                    f"**Slowest titles:**\n{slowest}"
+                ),
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
     @manganotifier.command(name="info")
     async def info(self, ctx, *, name: str):
-        """Get information about a manga"""
-        async with aiohttp.ClientSession() as session:
-            manga_update = await self.check_mangadex(session, name)
-            if not manga_update:
-                manga_update = await self.check_fallback_api(session, name)
-            if manga_update:
-                embed = discord.Embed(
-                    title=f"{name} Info",
-                    description=f"Latest episode: {manga_update['latest_episode']}",
-                    color=discord.Color.green()
-                )
-                if manga_update.get('cover_image'):
-                    embed.set_image(url=manga_update['cover_image'])
-                await ctx.send(embed=embed)
-            else:
-                await ctx.send(f"Failed to fetch details for {name}.")
+        """Get information about a manga
+
+        Tracked titles are answered from the local index while their
+        details are fresh.
+        """
+        key = self.index.resolve(name)
+        manga_update = self.index.details(key) if key else None
+        manga = await self.store.get_title(key) if key else None
+        if manga:
+            name = manga['name']
+        if manga_update is None:
+            await ctx.defer()
+            manga_update = await self.client.fetch_manga(self.http, name)
+            if manga_update and key:
+                self.index.set_details(key, manga_update)
+        if manga_update:
+            embed = discord.Embed(
+                title=f"{name} Info",
+                description=f"Latest episode: {manga_update['latest_episode']}",
+                color=discord.Color.green()
+            )
+            if manga_update.get('cover_image'):
+                embed.set_image(url=manga_update['cover_image'])
+            await ctx.send(embed=embed)
+        else:
+            await ctx.send(f"Failed to fetch details for {name}.")
+
+    @info.autocomplete("name")
+    async def info_autocomplete(self, interaction: discord.Interaction, current: str):
+        return self.autocomplete_choices(current)
 
     async def cog_unload(self):
-        self.manga_check_loop.cancel()
+        if self._startup_task:
+            self._startup_task.cancel()
+        await self.jobs.close()
+        self.notifications.close()
+        await self.store.close()
+        await self.http.close()
 
 
 async def setup(bot: Red):
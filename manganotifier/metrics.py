@@ -0,0 +1,78 @@
+import bisect
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class Histogram:
+    """Fixed-bucket histogram; cheap to update on every request."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class ProviderMetrics:
+    """Request counters and latency/parse-time histograms for a provider."""
+
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.bytes = 0
+        self.latency = Histogram()
+        self.parse_time = Histogram()
+
+    def record(self, started, status=None, size=0, parse_time=None):
+        """Record one request that started at ``time.perf_counter()`` ``started``.
+
+        ``status`` is the HTTP status, or None if the request failed before
+        a response arrived.
+        """
+        self.requests += 1
+        self.latency.observe(time.perf_counter() - started)
+        self.bytes += size
+        if parse_time is not None:
+            self.parse_time.observe(parse_time)
+        if status is None or status == 429 or status >= 500:
+            self.failures += 1
+        if status == 429:
+            self.rate_limited += 1
+
+
+class CycleStats:
+    """Timing of a single poll cycle."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.duration = 0.0
+        # title name -> seconds spent fetching it
+        self.timings = {}
+
+    def slowest(self, count=5):
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:count]
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+
+import discord
+
+log = logging.getLogger("red.imnic-cogs.manganotifier")
+
+# Discord allows roughly 5 messages per 5 seconds in a channel.
+CHANNEL_SEND_INTERVAL = 1.0
+# How long to wait for more notifications before flushing a channel.
+COALESCE_DELAY = 5.0
+MAX_EMBEDS = 10
+MAX_MESSAGE_EMBED_CHARS = 6000
+MAX_DESCRIPTION = 4096
+MAX_TITLE = 256
+
+
+def shorten(text, limit):
+    """Cut ``text`` to at most ``limit`` characters, marking the cut."""
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit - 1] + "\N{HORIZONTAL ELLIPSIS}"
+
+
+def pack_embeds(embeds):
+    """Split ``embeds`` into per-message lists within Discord's limits."""
+    messages = []
+    current, size = [], 0
+    for embed in embeds:
+        length = len(embed)
+        if current and (len(current) == MAX_EMBEDS or size + length > MAX_MESSAGE_EMBED_CHARS):
+            messages.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += length
+    if current:
+        messages.append(current)
+    return messages
+
+
+def digest_embeds(lines):
+    """Build compact digest embeds, one line per notification."""
+    embeds = []
+    description = ""
+    for line in lines:
+        line = shorten(line, MAX_DESCRIPTION)
+        if description and len(description) + len(line) + 1 > MAX_DESCRIPTION:
+            embeds.append(description)
+            description = ""
+        description = f"{description}\n{line}" if description else line
+    if description:
+        embeds.append(description)
+    total = len(embeds)
+    return [
+        discord.Embed(
+            title=f"{len(lines)} new episodes" + (f" ({i}/{total})" if total > 1 else ""),
+            description=text,
+            color=discord.Color.blue(),
+        ).set_footer(text="MangaNotifier")
+        for i, text in enumerate(embeds, 1)
+    ]
+
+
+class NotificationQueue:
+    """Per-channel queue that coalesces notifications into few messages.
+
+    Notifications for a channel are collected for ``delay`` seconds and
+    then flushed together: up to ten full embeds in one message, or a
+    compact digest when more are pending. Messages to one channel are
+    spaced by ``interval`` so a burst stays inside the channel's rate-limit
+    bucket, while different channels flush in parallel. discord.py still
+    handles any 429 that slips through.
+    """
+
+    def __init__(self, bot, delay=COALESCE_DELAY, interval=CHANNEL_SEND_INTERVAL):
+        self.bot = bot
+        self.delay = delay
+        self.interval = interval
+        self._pending = {}
+        self._workers = {}
+
+    @property
+    def pending(self):
+        """Number of notifications not sent yet."""
+        return sum(len(items) for items in self._pending.values())
+
+    def put(self, channel_id, embed, line):
+        """Queue ``embed`` for ``channel_id``; ``line`` is its digest entry."""
+        self._pending.setdefault(channel_id, []).append((embed, line))
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._drain(channel_id))
+
+    @staticmethod
+    def build_messages(items):
+        if len(items) <= MAX_EMBEDS:
+            return pack_embeds([embed for embed, _ in items])
+        return pack_embeds(digest_embeds([line for _, line in items]))
+
+    async def _drain(self, channel_id):
+        await asyncio.sleep(self.delay)
+        while self._pending.get(channel_id):
+            items = self._pending.pop(channel_id)
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                log.warning("Notification channel %s not found.", channel_id)
+                return
+            for embeds in self.build_messages(items):
+                try:
+                    await channel.send(embeds=embeds)
+                except (discord.Forbidden, discord.NotFound) as e:
+                    log.warning("Failed to send to channel %s: %s", channel_id, e)
+                except discord.HTTPException as e:
+                    if len(embeds) == 1:
+                        log.warning("Failed to send to channel %s: %s", channel_id, e)
+                    else:
+                        # One bad embed shouldn't take the rest of the batch down.
+                        await self._send_each(channel, embeds)
+                await asyncio.sleep(self.interval)
+
+    async def _send_each(self, channel, embeds):
+        for embed in embeds:
+            await asyncio.sleep(self.interval)
+            try:
+                await channel.send(embed=embed)
+            except discord.HTTPException as e:
+                log.warning("Failed to send to channel %s: %s", channel.id, e)
+
+    async def join(self):
+        """Wait until every queued notification has been sent."""
+        workers = [w for w in self._workers.values() if not w.done()]
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def close(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._pending.clear()
@@ -0,0 +1,354 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+from .metrics import ProviderMetrics
+
+log = logging.getLogger("red.imnic-cogs.manganotifier")
+
+
+def normalize_name(name):
+    """Return the key a manga title is stored under."""
+    return " ".join(name.casefold().split())
+
+# Give up on a single provider request after this many seconds.
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, sock_connect=5)
+# Retry once on gateway errors; throttling goes straight to the breaker.
+REQUEST_RETRIES = 1
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_RESPONSE_SIZE = 1024 ** 2
+# Alternate names kept per title for the local title index.
+MAX_ALT_TITLES = 10
+# Fire the secondary provider if the primary hasn't answered by then.
+HEDGE_DELAY = 1.5
+# Metadata of names nobody tracks (``info`` lookups, failed adds) stays in
+# memory only, for this many names at most.
+MAX_LOOKUPS = 256
+
+
+class CircuitBreaker:
+    """Skip a provider after repeated failures.
+
+    After ``threshold`` consecutive failures the breaker opens for
+    ``base_backoff`` seconds, doubling every time it trips again (up to
+    ``max_backoff``). Once the backoff has elapsed a single trial request is
+    let through; a success closes the breaker, a failure re-opens it.
+    ``available`` only peeks; ``allow`` takes the trial slot and must be
+    followed by ``record_success``, ``record_failure`` or ``release``.
+    """
+
+    def __init__(self, name, threshold=3, base_backoff=30, max_backoff=1800):
+        self.name = name
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._trial = False
+
+    @property
+    def is_open(self):
+        return self.failures >= self.threshold
+
+    def available(self):
+        """Return whether ``allow`` would let a request through right now."""
+        if not self.is_open:
+            return True
+        return not self._trial and time.monotonic() >= self.open_until
+
+    def allow(self):
+        if not self.available():
+            return False
+        if self.is_open:
+            self._trial = True
+        return True
+
+    def release(self):
+        """Give back the trial slot of a request that ended without a result."""
+        self._trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self.trips = 0
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.failures >= self.threshold:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** self.trips)
+            self.trips += 1
+            self.open_until = time.monotonic() + backoff
+
+
+async def hedged(primary, secondary, delay=HEDGE_DELAY):
+    """Return the first truthy result of ``primary()`` or ``secondary()``.
+
+    ``primary`` gets ``delay`` seconds on its own; if it is still running
+    after that, or finishes without a result, ``secondary`` is started as
+    well. Either argument may be None to skip that provider.
+    """
+    if primary is None and secondary is None:
+        return None
+    if primary is None:
+        return await secondary()
+    first = asyncio.ensure_future(primary())
+    if secondary is None:
+        return await first
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done and first.result():
+            return first.result()
+        if done:
+            pending = set()
+        pending.add(asyncio.ensure_future(secondary()))
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result():
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class MangaClient:
+    """MangaDex and AniList lookups, each behind its own circuit breaker.
+
+    The API base URLs and the hedge delay are attributes so they can be
+    pointed at a local stand-in server (see
+    ``benchmarks/manganotifier_standin.py``) or shortened in tests.
+    """
+
+    mangadex_url = "https://api.mangadex.org"
+    anilist_url = "https://graphql.anilist.co"
+    hedge_delay = HEDGE_DELAY
+
+    def __init__(self):
+        self.mangadex_breaker = CircuitBreaker("MangaDex")
+        self.anilist_breaker = CircuitBreaker("AniList")
+        self.metrics = {
+            "MangaDex": ProviderMetrics("MangaDex"),
+            "AniList": ProviderMetrics("AniList"),
+        }
+        # normalize_name(name) -> {'id', 'updated_at', 'cover_file',
+        # 'description'} for titles resolved on MangaDex.
+        self.metadata = {}
+        # Keys whose metadata changed since it was last persisted.
+        self.metadata_dirty = set()
+        # The same for untracked names, least recently used first; moved
+        # into ``metadata`` by ``track``.
+        self.lookups = OrderedDict()
+
+    def cached_metadata(self, key):
+        """Return the cached metadata of ``key``, tracked or not."""
+        return self.metadata.get(key) or self.lookups.get(key)
+
+    def track(self, key):
+        """Keep and persist the metadata looked up for ``key`` from now on."""
+        cached = self.lookups.pop(key, None)
+        if cached is not None:
+            self.metadata[key] = cached
+            self.metadata_dirty.add(key)
+
+    def forget(self, key):
+        self.metadata.pop(key, None)
+        self.metadata_dirty.discard(key)
+        self.lookups.pop(key, None)
+
+    def _cache(self, key, metadata):
+        if key in self.metadata:
+            self.metadata[key] = metadata
+            self.metadata_dirty.add(key)
+            return
+        self.lookups[key] = metadata
+        self.lookups.move_to_end(key)
+        while len(self.lookups) > MAX_LOOKUPS:
+            self.lookups.popitem(last=False)
+
+    async def fetch_manga(self, http, manga_name):
+        """Look ``manga_name`` up on MangaDex, hedged with AniList.
+
+        Providers whose circuit breaker is open are skipped entirely.
+        """
+        primary = secondary = None
+        if self.mangadex_breaker.available():
+            primary = functools.partial(self.check_mangadex, http, manga_name)
+        if self.anilist_breaker.available():
+            secondary = functools.partial(self.check_fallback_api, http, manga_name)
+        return await hedged(primary, secondary, self.hedge_delay)
+
+    async def _request(self, http, metrics, breaker, method, url, **kwargs):
+        """Send a request through the shared ``http`` client and return ``(status, data)``.
+
+        ``data`` is the decoded JSON body, or None if the request failed or
+        ``breaker`` didn't let it through. Updates ``metrics`` and
+        ``breaker`` once per request, after retries; a request that ends
+        without an outcome (e.g. cancelled by the hedge) gives its trial
+        slot back.
+        """
+        if not breaker.allow():
+            return None, None
+        try:
+            return await self._send(http, metrics, breaker, method, url, **kwargs)
+        finally:
+            # No-op once the outcome was recorded; frees the slot otherwise.
+            breaker.release()
+
+    async def _send(self, http, metrics, breaker, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await http.request(
+                method, url, retries=REQUEST_RETRIES, retry_statuses=RETRY_STATUSES,
+                max_size=MAX_RESPONSE_SIZE, timeout=REQUEST_TIMEOUT, **kwargs)
+            body, status = response.body, response.status
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            metrics.record(started)
+            log.warning("%s request timed out: %s", metrics.name, url)
+            return None, None
+        except aiohttp.ClientError as e:
+            breaker.record_failure()
+            metrics.record(started)
+            log.warning("%s connection error: %s", metrics.name, e)
+            return None, None
+
+        # A 4xx (e.g. AniList's 404 for no match) means the provider is up;
+        # only throttling and server errors trip the breaker.
+        if status == 429 or status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if status != 200:
+            metrics.record(started, status, len(body))
+            log.debug("%s returned HTTP %s for %s", metrics.name, status, url)
+            return status, None
+
+        parse_started = time.perf_counter()
+        try:
+            data = json.loads(body)
+        except ValueError:
+            log.warning("%s returned malformed JSON for %s", metrics.name, url)
+            data = None
+        metrics.record(started, status, len(body), time.perf_counter() - parse_started)
+        return status, data
+
+    async def _get_mangadex(self, http, params):
+        status, data = await self._request(
+            http, self.metrics['MangaDex'], self.mangadex_breaker,
+            'GET', f"{self.mangadex_url}/manga", params={'limit': 1, **params})
+        results = (data or {}).get('data') or []
+        return status, results[0] if results else None
+
+    async def check_mangadex(self, http, manga_name):
+        """Fetch the latest chapter of ``manga_name`` from MangaDex.
+
+        The first lookup searches by title with ``includes[]=cover_art`` so
+        the cover file name arrives in the same response. The manga ID,
+        cover and description are then cached in ``self.metadata`` for
+        tracked titles and in ``self.lookups`` for any other name, and later
+        lookups fetch by ID without includes, reusing the cached
+        metadata as long as the manga's ``updatedAt`` doesn't change.
+        """
+        key = normalize_name(manga_name)
+        cached = self.cached_metadata(key)
+        if key in self.lookups:
+            self.lookups.move_to_end(key)
+        if cached:
+            status, manga = await self._get_mangadex(http, {'ids[]': cached['id']})
+        else:
+            status, manga = await self._get_mangadex(http, {
+                'title': manga_name,
+                'includes[]': 'cover_art',
+                'order[relevance]': 'desc',
+            })
+        if manga is None or 'attributes' not in manga:
+            if status == 200:
+                log.debug("MangaDex has no results for %r", manga_name)
+            return None
+        attributes = manga['attributes']
+
+        if not cached or cached['updated_at'] != attributes.get('updatedAt'):
+            if cached:
+                # Metadata changed; fetch once more with the cover included.
+                status, manga = await self._get_mangadex(
+                    http, {'ids[]': cached['id'], 'includes[]': 'cover_art'})
+                if manga is None or 'attributes' not in manga:
+                    return None
+                attributes = manga['attributes']
+            cached = self._parse_metadata(manga)
+            self._cache(key, cached)
+            log.debug("Cached MangaDex metadata for %r: %r", manga_name, cached)
+
+        latest_chapter = attributes.get('latestChapter') or ''
+        if not latest_chapter.isdigit():
+            log.debug("No valid latestChapter found for %r", manga_name)
+            return None
+        cover_image = None
+        if cached['cover_file']:
+            cover_image = f"https://uploads.mangadex.org/covers/{cached['id']}/{cached['cover_file']}.256.jpg"
+        return {
+            'latest_episode': int(latest_chapter),
+            'cover_image': cover_image,
+            'description': cached['description'],
+            'url': f"https://mangadex.org/title/{cached['id']}",
+        }
+
+    @staticmethod
+    def _parse_metadata(manga):
+        attributes = manga['attributes']
+        cover_file = None
+        for rel in manga.get('relationships', []):
+            if rel.get('type') == 'cover_art':
+                cover_file = (rel.get('attributes') or {}).get('fileName')
+                break
+        descriptions = attributes.get('description') or {}
+        description = 'No description available.'
+        if isinstance(descriptions, dict):
+            description = descriptions.get('en', description)
+        alt_titles = [
+            title for alt in attributes.get('altTitles') or [] for title in alt.values()]
+        return {
+            'id': manga['id'],
+            'updated_at': attributes.get('updatedAt'),
+            'alt_titles': alt_titles[:MAX_ALT_TITLES],
+            'cover_file': cover_file,
+            'description': description,
+        }
+
+    async def check_fallback_api(self, http, manga_name):
+        query = """
+        query ($search: String) {
+          Media(search: $search, type: MANGA) {
+            id
+            chapters
+          }
+        }
+        """
+        variables = {'search': manga_name}
+        status, data = await self._request(
+            http, self.metrics['AniList'], self.anilist_breaker,
+            'POST', self.anilist_url, json={'query': query, 'variables': variables})
+        media_data = ((data or {}).get('data') or {}).get('Media')
+        if not media_data:
+            if status == 200:
+                log.debug("AniList response data not found or malformed: %r", data)
+            return None
+        log.debug("AniList response data: %r", media_data)
+        chapters = media_data.get('chapters')
+        if not chapters:
+            log.debug("No chapters found for %r in AniList response", manga_name)
+            return None
+        return {
+            'latest_episode': chapters,
+            'url': f"https://anilist.co/manga/{media_data['id']}",
+        }
@@ -0,0 +1,165 @@
+import heapq
+import time
+from collections import deque
+from statistics import median
+
+MIN_INTERVAL = 10 * 60
+MAX_INTERVAL = 24 * 60 * 60
+DEFAULT_INTERVAL = 30 * 60
+# Keep this many release timestamps per title to estimate its cadence.
+RELEASE_HISTORY = 8
+# Each failed fetch in a row doubles the interval, up to this many times.
+MAX_FAILURE_BACKOFF = 6
+
+
+def record_release(manga, now=None):
+    """Append a release timestamp to ``manga['releases']``."""
+    now = time.time() if now is None else now
+    releases = manga.setdefault('releases', [])
+    releases.append(now)
+    del releases[:-RELEASE_HISTORY]
+
+
+def next_interval(manga, now=None):
+    """Seconds until ``manga`` should be checked again.
+
+    The interval follows the observed release cadence: checks are dense
+    right after a release and around the expected next one, and back off
+    the longer a title stays past its expected release. Without a cadence
+    the interval grows with the time since the last release, or since the
+    title was added. Fetches that keep failing back off exponentially.
+    """
+    now = time.time() if now is None else now
+    interval = _cadence_interval(manga, now)
+    failures = min(manga.get('failures', 0), MAX_FAILURE_BACKOFF)
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval * 2 ** failures))
+
+
+def _cadence_interval(manga, now):
+    releases = manga.get('releases') or []
+    gaps = [b - a for a, b in zip(releases, releases[1:]) if b > a]
+    if not gaps:
+        # No cadence yet; a title that stays quiet is checked less and less.
+        last_seen = releases[-1] if releases else manga.get('added')
+        if last_seen is None:
+            return DEFAULT_INTERVAL
+        return max(DEFAULT_INTERVAL, (now - last_seen) / 4)
+    cadence = median(gaps)
+    since_release = now - releases[-1]
+    until_expected = cadence - since_release
+    if since_release < MIN_INTERVAL * 3:
+        # Just released; publishers often push fixes or a second chapter.
+        interval = MIN_INTERVAL
+    elif until_expected > 0:
+        # Sleep towards the expected release, tightening as it approaches.
+        interval = until_expected / 4
+    else:
+        # Overdue: back off in proportion to how late the title is.
+        interval = -until_expected / 4
+    return interval
+
+
+class PollScheduler:
+    """Priority queue of titles ordered by their next check time.
+
+    ``budget_per_hour`` caps the HTTP requests per rolling hour. A title
+    costs one request or more (hedges, retries, covers), so callers report
+    what a poll really sent through :meth:`charge`; :meth:`pop_due` hands
+    out at most one title per remaining request. Titles over budget simply
+    stay queued.
+    """
+
+    def __init__(self, budget_per_hour=120):
+        self.budget_per_hour = budget_per_hour
+        self._heap = []
+        self._due = {}
+        # (time, requests) in the order they were charged
+        self._spent = deque()
+        self._spent_total = 0
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, key):
+        return key in self._due
+
+    def schedule(self, key, due):
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+
+    def discard(self, key):
+        # Heap entries are invalidated lazily in pop_due.
+        self._due.pop(key, None)
+
+    def clear(self):
+        self._heap.clear()
+        self._due.clear()
+
+    def charge(self, requests, now=None):
+        """Count ``requests`` sent at ``now`` against the hourly budget."""
+        if requests > 0:
+            self._spent.append((time.time() if now is None else now, requests))
+            self._spent_total += requests
+
+    def remaining_budget(self, now=None):
+        now = time.time() if now is None else now
+        while self._spent and self._spent[0][0] <= now - 3600:
+            self._spent_total -= self._spent.popleft()[1]
+        return max(0, self.budget_per_hour - self._spent_total)
+
+    def pop_due(self, now=None):
+        """Remove and return the keys that are due, within the budget."""
+        now = time.time() if now is None else now
+        budget = self.remaining_budget(now)
+        keys = []
+        while self._heap and len(keys) < budget:
+            due, key = self._heap[0]
+            if self._due.get(key) != due:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            del self._due[key]
+            keys.append(key)
+        return keys
+
+
+async def poll_titles(client, http, scheduler, titles, keys, notify, timings=None, index=None):
+    """Run one poll over ``keys`` and reschedule each polled title.
+
+    ``titles`` is the key -> title mapping and is updated in place;
+    ``notify`` is called as ``notify(key, name, episode, url, cover_image,
+    description)`` for every new episode. If ``timings`` is given, the
+    seconds spent fetching each title are stored in it by name, and a
+    given TitleIndex is refreshed with every fetched title. Returns the
+    polled titles by key so the caller can persist them in one write.
+    """
+    changed = {}
+    for key in keys:
+        manga = titles.get(key)
+        if manga is None:
+            continue
+        started = time.perf_counter()
+        manga_update = await client.fetch_manga(http, manga['name'])
+        if timings is not None:
+            timings[manga['name']] = time.perf_counter() - started
+
+        now = time.time()
+        if manga_update:
+            # Titles tracked from before their first MangaDex hit.
+            client.track(key)
+        if manga_update and index is not None:
+            index.add(key, [manga['name'], *client.metadata.get(key, {}).get('alt_titles', [])])
+            index.set_details(key, manga_update, now)
+        manga['failures'] = 0 if manga_update else manga.get('failures', 0) + 1
+        if manga_update:
+            latest_episode = manga_update.get('latest_episode', 0)
+            if latest_episode > manga['last_episode']:
+                notify(key, manga['name'], latest_episode, manga_update['url'], manga_update.get('cover_image'), manga_update.get('description'))
+                manga['last_episode'] = latest_episode
+                record_release(manga, now)
+        manga['next_check'] = now + next_interval(manga, now)
+        scheduler.schedule(key, manga['next_check'])
+        changed[key] = manga
+    return changed
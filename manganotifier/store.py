@@ -0,0 +1,192 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_episode INTEGER NOT NULL DEFAULT 0,
+    releases TEXT NOT NULL DEFAULT '[]',
+    next_check REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    added REAL
+);
+CREATE INDEX IF NOT EXISTS titles_next_check ON titles (next_check);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    mangadex_id TEXT NOT NULL,
+    updated_at TEXT,
+    cover_file TEXT,
+    description TEXT,
+    alt_titles TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS metadata_mangadex_id ON metadata (mangadex_id);
+"""
+
+
+class StateStore:
+    """SQLite store for per-title polling state and cached metadata.
+
+    All queries run on a single worker thread so the event loop never
+    blocks on disk I/O; writes are grouped into one transaction per call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="manganotifier-db")
+        self._conn = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        def _open():
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(titles)")}
+            if 'added' not in columns:
+                # Databases from before ``added``; count their titles from now.
+                with conn:
+                    conn.execute("ALTER TABLE titles ADD COLUMN added REAL")
+                    conn.execute("UPDATE titles SET added = ?", (time.time(),))
+            # Older versions also stored metadata of names nobody tracked.
+            with conn:
+                conn.execute("DELETE FROM metadata WHERE key NOT IN (SELECT key FROM titles)")
+            return conn
+        self._conn = await self._run(_open)
+
+    async def close(self):
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _title(row):
+        return {
+            'name': row['name'],
+            'last_episode': row['last_episode'],
+            'releases': json.loads(row['releases']),
+            'next_check': row['next_check'],
+            'failures': row['failures'],
+            'added': row['added'],
+        }
+
+    async def names(self):
+        """Return ``{key: name}`` for every tracked title."""
+        def _names():
+            return {row['key']: row['name'] for row in self._conn.execute(
+                "SELECT key, name FROM titles")}
+        return await self._run(_names)
+
+    async def schedule(self):
+        """Return ``(key, next_check)`` for every title, soonest first."""
+        def _schedule():
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT key, next_check FROM titles ORDER BY next_check")]
+        return await self._run(_schedule)
+
+    async def get_titles(self, keys):
+        """Return the titles for ``keys`` that exist, by key."""
+        keys = list(keys)
+
+        def _get():
+            titles = {}
+            # Stay below SQLite's bound parameter limit.
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT * FROM titles WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                titles.update((row['key'], self._title(row)) for row in rows)
+            return titles
+        return await self._run(_get)
+
+    async def get_title(self, key):
+        return (await self.get_titles([key])).get(key)
+
+    async def find_by_mangadex_id(self, mangadex_id):
+        """Return the key of the title resolved to ``mangadex_id``, if any."""
+        def _find():
+            row = self._conn.execute(
+                "SELECT key FROM metadata WHERE mangadex_id = ?", (mangadex_id,)).fetchone()
+            return row['key'] if row else None
+        return await self._run(_find)
+
+    async def save_titles(self, titles, replace=True):
+        """Write ``{key: title}`` in one transaction.
+
+        With ``replace=False`` titles that already exist are left untouched.
+        Titles without ``added`` are stamped with the current time.
+        """
+        now = time.time()
+        rows = [
+            (key, t['name'], t['last_episode'], json.dumps(t.get('releases', [])),
+             t.get('next_check'), t.get('failures', 0), t.get('added') or now)
+            for key, t in titles.items()
+        ]
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+
+        def _save():
+            with self._conn:
+                self._conn.executemany(
+                    f"{verb} INTO titles (key, name, last_episode, releases, next_check, failures, added) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        await self._run(_save)
+
+    async def update_polled(self, titles):
+        """Store the polling state of ``titles`` that still exist."""
+        rows = [
+            (t['last_episode'], json.dumps(t.get('releases', [])),
+             t.get('next_check'), t.get('failures', 0), key)
+            for key, t in titles.items()
+        ]
+
+        def _update():
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE titles SET last_episode = ?, releases = ?, next_check = ?, "
+                    "failures = ? WHERE key = ?", rows)
+        await self._run(_update)
+
+    async def delete_title(self, key):
+        def _delete():
+            with self._conn:
+                self._conn.execute("DELETE FROM titles WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+        await self._run(_delete)
+
+    async def load_metadata(self):
+        def _load():
+            return {
+                row['key']: {
+                    'id': row['mangadex_id'],
+                    'updated_at': row['updated_at'],
+                    'cover_file': row['cover_file'],
+                    'description': row['description'],
+                    'alt_titles': json.loads(row['alt_titles']),
+                }
+                for row in self._conn.execute("SELECT * FROM metadata")
+            }
+        return await self._run(_load)
+
+    async def save_metadata(self, metadata):
+        """Write ``{key: metadata}`` in one transaction."""
+        rows = [
+            (key, m['id'], m.get('updated_at'), m.get('cover_file'), m.get('description'),
+             json.dumps(m.get('alt_titles', [])))
+            for key, m in metadata.items()
+        ]
+
+        def _save():
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO metadata "
+                    "(key, mangadex_id, updated_at, cover_file, description, alt_titles) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        await self._run(_save)
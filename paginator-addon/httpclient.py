@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+log = logging.getLogger("red.imnic-cogs.paginator.http")
+
+# Connection pool limits for all requests of the cog.
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=10)
+# Bodies larger than this are refused unless a request allows more.
+DEFAULT_MAX_SIZE = 8 * 1024 ** 2
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Full-jitter exponential backoff between attempts, in seconds.
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ResponseTooLarge(aiohttp.ClientPayloadError):
+    """Raised when a response body exceeds the allowed size."""
+
+
+class HostMetrics:
+    """Request counters for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.requests if self.requests else 0.0
+
+    def record(self, started, size=0, failed=False):
+        elapsed = time.perf_counter() - started
+        self.requests += 1
+        self.failures += failed
+        self.bytes += size
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+class Response:
+    """A fully read response; the connection is already back in the pool."""
+
+    def __init__(self, response, body):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = response.url
+        self.body = body
+        self._request_info = response.request_info
+        self._history = response.history
+        self._encoding = response.charset or "utf-8"
+
+    def text(self, encoding=None):
+        return self.body.decode(encoding or self._encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                self._request_info, self._history,
+                status=self.status, message=self.reason, headers=self.headers)
+
+
+def backoff(attempt, retry_after=None):
+    """Return the delay before retry number ``attempt`` (starting at 0)."""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class HTTPClient:
+    """Pooled HTTP client used for every request of the cog.
+
+    One ``aiohttp.ClientSession`` keeps connections alive and caches DNS
+    lookups across all requests, with a per-host connection limit. Every
+    request is fully read (up to ``max_size`` bytes), retried with jittered
+    backoff on connection errors, timeouts and ``retry_statuses``, and
+    counted in ``metrics`` by host. Only idempotent methods are retried
+    unless ``retries`` is passed explicitly.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.metrics: Dict[str, HostMetrics] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=POOL_LIMIT,
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=DEFAULT_TIMEOUT)
+        return self._session
+
+    async def request(
+        self,
+        method,
+        url,
+        *,
+        retries=None,
+        retry_statuses=RETRY_STATUSES,
+        max_size=DEFAULT_MAX_SIZE,
+        **kwargs,
+    ) -> Response:
+        """Send a request and return the read ``Response``.
+
+        Responses with any status are returned once retries are used up;
+        connection errors and timeouts are raised.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = DEFAULT_RETRIES if method in IDEMPOTENT_METHODS else 0
+        metrics = self.metrics.setdefault(urlsplit(str(url)).hostname or "", HostMetrics())
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await self._read(response, max_size)
+            except ResponseTooLarge:
+                metrics.record(started, failed=True)
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.record(started, failed=True)
+                if attempt >= retries:
+                    raise
+                log.debug("Retrying %s %s after %r", method, url, e)
+                delay = backoff(attempt)
+            else:
+                failed = response.status in retry_statuses
+                metrics.record(started, len(body), failed)
+                if not failed or attempt >= retries:
+                    return Response(response, body)
+                log.debug("Retrying %s %s after HTTP %s", method, url, response.status)
+                delay = backoff(attempt, response.headers.get("Retry-After"))
+            metrics.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read(response, max_size):
+        if response.content_length is not None and response.content_length > max_size:
+            raise ResponseTooLarge(f"{response.url} is {response.content_length} bytes")
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > max_size:
+                raise ResponseTooLarge(f"{response.url} is larger than {max_size} bytes")
+        return bytes(body)
+
+    async def close(self):
+        """Close the pooled session; call from ``cog_unload``."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
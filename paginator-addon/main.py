@@ -1,13 +1,13 @@
 import json
 from typing import Optional
 
-import aiohttp
 import discord
 import os
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 from redbot.core.utils import chat_formatting as cf
 
+from .httpclient import HTTPClient
 from .utils import *
 from .views import PaginationView
 
@@ -46,10 +46,10 @@ class Paginator(commands.Cog):
 
         self.config.register_guild(**{"page_groups": {}})
 
-        self.session = aiohttp.ClientSession()
+        self.http = HTTPClient()
 
     async def cog_unload(self):
-        await self.session.close()
+        await self.http.close()
 
     async def reaction_paginate(
         self,
@@ -10,6 +10,8 @@ from redbot.core import commands
 from redbot.core.utils import chat_formatting as cf
 from redbot.core.utils import menus
 
+from .httpclient import ResponseTooLarge
+
 __all__ = ["Page", "PageGroup", "StringToPage", "PastebinConverter", "PrivatebinConverter"]
 
 # Page & Group type definitions
@@ -23,6 +25,9 @@ class PageGroup(TypedDict):
     reactions: Union[list[str], bool]
     delete_on_timeout: bool
 
+# Pastes larger than this are refused instead of downloaded.
+MAX_PASTE_SIZE = 1024 ** 2
+
 # Regex for Pastebin
 PASTEBIN_RE = re.compile(r"(?:https?://(?:www\.)?)?pastebin\.com/(?:raw/)?([a-zA-Z0-9]+)")
 
@@ -158,10 +163,14 @@ class PastebinMixin:
         if not match:
             raise commands.BadArgument(f"`{argument}` is not a valid Pastebin link.")
         paste_id = match.group(1)
-        async with ctx.cog.session.get(f"https://pastebin.com/raw/{paste_id}") as resp:
-            if resp.status != 200:
-                raise commands.BadArgument(f"`{argument}` returned HTTP {resp.status}.")
-            send_data = await resp.text()
+        try:
+            resp = await ctx.cog.http.request(
+                "GET", f"https://pastebin.com/raw/{paste_id}", max_size=MAX_PASTE_SIZE)
+        except ResponseTooLarge:
+            raise commands.BadArgument(f"`{argument}` is too large.")
+        if resp.status != 200:
+            raise commands.BadArgument(f"`{argument}` returned HTTP {resp.status}.")
+        send_data = resp.text()
         return await super().convert(ctx, send_data)
 
 
@@ -193,12 +202,15 @@ class PrivatebinMixin:
         # For demonstration, let's assume the user just pastes the full link:
         # "https://privatebin.domain/?pasteID..."
         # We'll do a direct GET on that link:
-        async with ctx.cog.session.get(argument) as resp:
-            if resp.status != 200:
-                raise commands.BadArgument(
-                    f"`{argument}` returned HTTP {resp.status} from PrivateBin."
-                )
-            send_data = await resp.text()
+        try:
+            resp = await ctx.cog.http.request("GET", argument, max_size=MAX_PASTE_SIZE)
+        except ResponseTooLarge:
+            raise commands.BadArgument(f"`{argument}` is too large.")
+        if resp.status != 200:
+            raise commands.BadArgument(
+                f"`{argument}` returned HTTP {resp.status} from PrivateBin."
+            )
+        send_data = resp.text()
 
         # Now pass the data (json or yaml) upward for conversion
         return await super().convert(ctx, send_data)
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+from manganotifier.providers import CircuitBreaker, MangaClient, hedged
+
+MANGADEX_HIT = {'data': [{
+    'id': 'md-1',
+    'attributes': {'latestChapter': '12', 'updatedAt': '2024-01-01T00:00:00'},
+    'relationships': [],
+}]}
+MANGADEX_MISS = {'data': []}
+ANILIST_HIT = {'data': {'Media': {'id': 7, 'chapters': 12}}}
+
+
+class FakeResponse:
+    def __init__(self, data, status=200):
+        self.status = status
+        self.body = json.dumps(data).encode()
+
+
+class FakeHTTP:
+    """Answers MangaDex and AniList requests after a configurable delay."""
+
+    def __init__(self, mangadex=MANGADEX_HIT, anilist=ANILIST_HIT, mangadex_delay=0, anilist_delay=0):
+        self.mangadex = mangadex
+        self.anilist = anilist
+        self.mangadex_delay = mangadex_delay
+        self.anilist_delay = anilist_delay
+        self.calls = []
+
+    async def request(self, method, url, **kwargs):
+        provider = 'AniList' if url == MangaClient.anilist_url else 'MangaDex'
+        self.calls.append(provider)
+        if provider == 'AniList':
+            await asyncio.sleep(self.anilist_delay)
+            return FakeResponse(self.anilist)
+        await asyncio.sleep(self.mangadex_delay)
+        return FakeResponse(self.mangadex)
+
+
+def trip(breaker):
+    """Open ``breaker`` and let its backoff expire, leaving it half-open."""
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    breaker.open_until = 0
+
+
+def make_client():
+    client = MangaClient()
+    client.hedge_delay = 0.05
+    return client
+
+
+def test_hedged_prefers_fast_primary():
+    started = []
+
+    async def primary():
+        return 'primary'
+
+    async def secondary():
+        started.append(True)
+        return 'secondary'
+
+    assert asyncio.run(hedged(primary, secondary, 0.05)) == 'primary'
+    assert not started
+
+
+def test_hedged_falls_back_when_primary_is_empty():
+    async def primary():
+        return None
+
+    async def secondary():
+        return 'secondary'
+
+    assert asyncio.run(hedged(primary, secondary, 0.05)) == 'secondary'
+
+
+def test_breaker_allows_one_trial_when_half_open():
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    assert breaker.available()
+    assert breaker.allow()
+    assert not breaker.available()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+def test_unused_secondary_keeps_its_trial_slot():
+    client = make_client()
+    trip(client.anilist_breaker)
+    http = FakeHTTP()
+
+    result = asyncio.run(client.fetch_manga(http, 'Some Manga'))
+    assert result['latest_episode'] == 12
+    assert http.calls == ['MangaDex']
+    # The secondary never started, so its breaker is still up for a trial.
+    assert client.anilist_breaker.available()
+
+    http.mangadex = MANGADEX_MISS
+    result = asyncio.run(client.fetch_manga(http, 'Other Manga'))
+    assert result['latest_episode'] == 12
+    assert http.calls[-1] == 'AniList'
+    assert not client.anilist_breaker.is_open
+
+
+def test_cancelled_loser_releases_trial_slot():
+    client = make_client()
+    trip(client.mangadex_breaker)
+    http = FakeHTTP(mangadex_delay=1)
+
+    result = asyncio.run(client.fetch_manga(http, 'Some Manga'))
+    assert result['url'] == 'https://anilist.co/manga/7'
+    # MangaDex was cancelled mid-request without an outcome.
+    assert client.mangadex_breaker.is_open
+    assert client.mangadex_breaker.available()
+
+
+def test_untracked_lookups_stay_out_of_metadata():
+    client = make_client()
+    http = FakeHTTP()
+
+    asyncio.run(client.fetch_manga(http, 'Some Manga'))
+    assert client.metadata == {}
+    assert not client.metadata_dirty
+    assert client.cached_metadata('some manga')['id'] == 'md-1'
+
+    client.track('some manga')
+    assert client.metadata['some manga']['id'] == 'md-1'
+    assert client.metadata_dirty == {'some manga'}
+    assert 'some manga' not in client.lookups
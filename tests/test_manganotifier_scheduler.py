@@ -0,0 +1,30 @@
+from manganotifier.scheduler import (
+    DEFAULT_INTERVAL, MAX_INTERVAL, PollScheduler, next_interval,
+)
+
+NOW = 1_700_000_000
+DAY = 24 * 60 * 60
+
+
+def test_new_title_uses_default_interval():
+    assert next_interval({'added': NOW}, NOW) == DEFAULT_INTERVAL
+
+
+def test_dormant_title_backs_off():
+    assert next_interval({'added': NOW - 2 * 365 * DAY}, NOW) == MAX_INTERVAL
+    assert next_interval({'releases': [NOW - 3 * DAY]}, NOW) > DEFAULT_INTERVAL
+
+
+def test_failures_back_off_exponentially():
+    title = {'added': NOW}
+    assert next_interval(dict(title, failures=2), NOW) == 4 * next_interval(title, NOW)
+
+
+def test_budget_counts_charged_requests():
+    scheduler = PollScheduler(budget_per_hour=5)
+    for key in 'abcdef':
+        scheduler.schedule(key, NOW)
+    assert scheduler.pop_due(NOW) == ['a', 'b', 'c', 'd', 'e']
+    scheduler.charge(5, NOW)
+    assert scheduler.pop_due(NOW) == []
+    assert scheduler.pop_due(NOW + 3601) == ['f']
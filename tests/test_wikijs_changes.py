@@ -0,0 +1,42 @@
+from wikijs_api.revisions import NO_BASELINE, RevisionCache
+from wikijs_api.wikijs_api import advance_cursor, is_newer, shared_cursor
+
+
+def page(page_id, updated_at):
+    return {"id": page_id, "updatedAt": updated_at}
+
+
+def test_shared_cursor_keeps_common_ids():
+    cursor = shared_cursor([
+        {"updated_at": "2024-01-02", "ids": [1, 2]},
+        {"updated_at": "2024-01-02", "ids": [2, 3]},
+        {"updated_at": "2024-01-03", "ids": [4]},
+    ])
+    assert cursor == {"updated_at": "2024-01-02", "ids": [2]}
+    assert not is_newer(page(2, "2024-01-02"), cursor)
+    assert is_newer(page(1, "2024-01-02"), cursor)
+
+
+def test_idle_wiki_has_no_new_pages():
+    cursor = advance_cursor(None, [page(1, "2024-01-02")])
+    assert not is_newer(page(1, "2024-01-02"), shared_cursor([cursor, cursor]))
+
+
+def test_no_cursors_means_no_shared_cursor():
+    assert shared_cursor([]) is None
+
+
+def test_revision_stays_pending_until_stored(tmp_path):
+    revisions = RevisionCache(str(tmp_path))
+    assert revisions.compare("https://wiki", 1, "alt") is NO_BASELINE
+    revisions.store("https://wiki", 1, "alt")
+
+    assert revisions.compare("https://wiki", 1, "neu")["added"] == 1
+    # Nicht gespeichert, etwa weil das Senden fehlschlug: nach einem
+    # Neustart wird die Änderung wieder gefunden.
+    revisions.save()
+    reloaded = RevisionCache(str(tmp_path))
+    assert reloaded.compare("https://wiki", 1, "neu")["added"] == 1
+
+    reloaded.store("https://wiki", 1, "neu")
+    assert reloaded.compare("https://wiki", 1, "neu") is None
@@ -0,0 +1,18 @@
+import random
+
+from wikijs_api.reader import split_markdown
+
+
+def test_boundary_tail_is_split_again():
+    text = "a\n\n" + "\n".join(["x" * 99] * 37) + "\n" + "y" * 700 + "\nz" * 27
+    chunks = split_markdown(text)
+    assert max(map(len, chunks)) <= 3800
+
+
+def test_random_documents_stay_within_limit():
+    rng = random.Random(0)
+    pieces = ["", "# Titel", "```python", "~~~", "text " * 20, "x" * 500, "y" * 5000]
+    for limit in (100, 500, 3800):
+        for _ in range(200):
+            text = "\n".join(rng.choice(pieces) for _ in range(rng.randint(1, 60)))
+            assert all(len(chunk) <= limit for chunk in split_markdown(text, limit))
@@ -0,0 +1,140 @@
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import discord
+
+# Länge einer Leseseite; lässt Platz für das Schließen eines Codeblocks.
+READ_PAGE_CHARS = 3800
+# So lange werden abgerufene Seiten ohne Rückfrage beim Wiki ausgeliefert.
+PAGE_CACHE_TTL = 5 * 60
+PAGE_CACHE_BYTES = 10 * 1024 * 1024
+
+HEADING_RE = re.compile(r"^#{1,6}\s")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+# Ein wieder geöffneter Codeblock beginnt mit höchstens so vielen Zeichen
+# der ursprünglichen Zeile, z. B. ```python.
+MAX_FENCE_CHARS = 20
+# Wieder geöffnete Zeile, Zeilenumbrüche und schließendes ``` zusammen.
+FENCE_OVERHEAD = MAX_FENCE_CHARS + 6
+
+
+def split_markdown(text, limit=READ_PAGE_CHARS):
+    """Teilt Markdown in Stücke von höchstens ``limit`` Zeichen.
+
+    Getrennt wird bevorzugt vor Überschriften und an Leerzeilen, sonst
+    zwischen Zeilen; nur Zeilen, die allein nicht passen, werden hart
+    getrennt. Muss ein Codeblock geteilt werden, wird er am Ende des
+    Stücks geschlossen und im nächsten mit derselben Zeile wieder geöffnet.
+    """
+    chunks = []
+    lines = []
+    size = 0
+    # Index in ``lines``, an dem zuletzt getrennt werden durfte.
+    boundary = 0
+    fence = None
+
+    def flush(end):
+        nonlocal lines, size, boundary
+        chunk, rest = lines[:end], lines[end:]
+        open_fence = None
+        for line in chunk:
+            if FENCE_RE.match(line):
+                open_fence = None if open_fence else line.strip()[:MAX_FENCE_CHARS]
+        text = "\n".join(chunk).strip("\n")
+        if open_fence:
+            text += "\n```"
+            rest = [open_fence] + rest
+        if text.strip():
+            chunks.append(text)
+        lines, size, boundary = rest, sum(len(line) + 1 for line in rest), 0
+
+    def fits(line, reserve):
+        return size + len(line) + 1 + reserve <= limit
+
+    for raw in text.splitlines():
+        # So lang darf ein Stück einer Zeile höchstens sein, damit es in ein
+        # leeres Stück passt, auch hinter einem wieder geöffneten Codeblock.
+        room = limit - (FENCE_OVERHEAD if fence else 1)
+        for start in range(0, max(len(raw), 1), room):
+            line = raw[start:start + room]
+            is_fence = FENCE_RE.match(line)
+            if fence is None and lines and (not line.strip() or HEADING_RE.match(line)):
+                boundary = len(lines)
+            # Im oder am Anfang eines Codeblocks Platz für das schließende ``` lassen.
+            reserve = 4 if fence or is_fence else 0
+            if not fits(line, reserve):
+                flush(boundary or len(lines))
+                # Der Rest hinter der Trennstelle kann selbst noch zu lang sein.
+                if not fits(line, reserve):
+                    flush(len(lines))
+            lines.append(line)
+            size += len(line) + 1
+            if is_fence:
+                fence = None if fence else line
+    if lines:
+        flush(len(lines))
+    return chunks
+
+
+class PageCache:
+    """Zwischenspeicher für abgerufene Seiten mit Ablaufzeit.
+
+    Nach ``ttl`` Sekunden wird ein Eintrag nicht verworfen, sondern nur
+    als zu prüfen markiert: Stimmt ``updatedAt`` im Wiki noch, wird der
+    gespeicherte Inhalt weiterverwendet (wie ein ETag). Die ältesten
+    Einträge fallen heraus, sobald alle zusammen ``max_bytes`` übersteigen.
+    """
+
+    def __init__(self, ttl=PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (geprüft_um, page)
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        """Gibt ``(page, fresh)`` zurück oder ``(None, False)``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        self._entries.move_to_end(key)
+        checked_at, page = entry
+        return page, time.time() - checked_at < self.ttl
+
+    def put(self, key, page):
+        self.discard(key)
+        self._entries[key] = (time.time(), page)
+        self._size += len(page["content"])
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, (_, old) = self._entries.popitem(last=False)
+            self._size -= len(old["content"])
+
+    def touch(self, key):
+        """Markiert einen Eintrag nach erfolgreicher Prüfung wieder als frisch."""
+        if key in self._entries:
+            self._entries[key] = (time.time(), self._entries[key][1])
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1]["content"])
+
+
+class ReaderPages(Sequence):
+    """Die Seiten von ``wikijs read``; Embeds entstehen erst beim Anzeigen."""
+
+    def __init__(self, title, url, chunks):
+        self.title = title
+        self.url = url
+        self.chunks = chunks
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def __getitem__(self, index):
+        embed = discord.Embed(title=self.title[:256], url=self.url, description=self.chunks[index])
+        if len(self.chunks) > 1:
+            embed.set_footer(text=f"Abschnitt {index + 1}/{len(self.chunks)}")
+        return {"embeds": [embed]}
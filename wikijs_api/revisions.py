@@ -0,0 +1,134 @@
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Gesamtgröße der gespeicherten Seitenstände, danach werden die ältesten verworfen.
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+# So viele geänderte Zeilen zeigt die Zusammenfassung höchstens.
+MAX_DIFF_LINES = 3
+MAX_DIFF_LINE_LENGTH = 80
+# Ergebnis von ``RevisionCache.update``, wenn kein vorheriger Stand vorliegt,
+# etwa beim ersten Abruf oder nachdem der Inhalt verworfen wurde.
+NO_BASELINE = object()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def summarize_diff(old, new):
+    """Gibt eine kurze Zusammenfassung der Zeilenänderungen zurück."""
+    added = removed = 0
+    samples = []
+    for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0):
+        if line.startswith(("+++", "---", "@@")):
+            continue
+        if line.startswith("+"):
+            added += 1
+        elif line.startswith("-"):
+            removed += 1
+        else:
+            continue
+        text = line[1:].strip()
+        if text and len(samples) < MAX_DIFF_LINES:
+            if len(text) > MAX_DIFF_LINE_LENGTH:
+                text = text[:MAX_DIFF_LINE_LENGTH - 1] + "…"
+            samples.append(f"{line[0]} {text}")
+    return {"added": added, "removed": removed, "samples": samples}
+
+
+class RevisionCache:
+    """Speichert Inhalts-Hashes und den letzten Stand jeder Seite auf der Platte.
+
+    Die Hashes bleiben dauerhaft im Index; die Seiteninhalte selbst werden
+    nach dem Zeitpunkt des letzten Zugriffs verworfen, sobald sie zusammen
+    größer als ``max_bytes`` sind. Alle Methoden blockieren und sollten in
+    einem Worker-Thread laufen.
+    """
+
+    def __init__(self, path, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._index_path = os.path.join(path, "index.json")
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                # Eintrag: {"hash", "size", "used"}; "size" 0 = Inhalt verworfen
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+        # Ob seit dem letzten ``save`` ein neuer Stand gespeichert wurde.
+        self.dirty = False
+
+    @staticmethod
+    def _key(wiki_url, page_id):
+        return hashlib.sha1(f"{wiki_url}#{page_id}".encode()).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.txt")
+
+    def compare(self, wiki_url, page_id, content):
+        """Vergleicht ``content`` mit dem gespeicherten Stand, ohne ihn zu ersetzen.
+
+        Gibt ``None`` zurück, wenn sich der Inhalt nicht geändert hat, sonst
+        eine Diff-Zusammenfassung (``summarize_diff``), oder ``NO_BASELINE``,
+        wenn es keinen vorherigen Stand zum Vergleichen gibt. Neue Stände
+        übernimmt erst ``store``, nachdem sie gemeldet wurden.
+        """
+        key = self._key(wiki_url, page_id)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and entry["hash"] == content_hash(content):
+                entry["used"] = time.time()
+                return None
+            if entry and entry["size"]:
+                try:
+                    with open(self._file(key), encoding="utf-8") as f:
+                        return summarize_diff(f.read(), content)
+                except OSError:
+                    pass
+            return NO_BASELINE
+
+    def store(self, wiki_url, page_id, content):
+        """Speichert ``content`` als neuen Vergleichsstand der Seite."""
+        key = self._key(wiki_url, page_id)
+        new_hash = content_hash(content)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and entry["hash"] == new_hash:
+                return
+            with open(self._file(key), "w", encoding="utf-8") as f:
+                f.write(content)
+            self._index[key] = {
+                "hash": new_hash,
+                "size": len(content.encode()),
+                "used": time.time(),
+            }
+            self.dirty = True
+            self._evict()
+
+    def _evict(self):
+        stored = [(e["used"], k) for k, e in self._index.items() if e["size"]]
+        total = sum(self._index[k]["size"] for _, k in stored)
+        for _, key in sorted(stored):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._index[key]["size"] = 0
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def save(self):
+        """Schreibt den Index atomar auf die Platte."""
+        with self._lock:
+            self.dirty = False
+            tmp = f"{self._index_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self._index_path)
@@ -0,0 +1,126 @@
+import bisect
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Gewichte der Felder einer Seite.
+FIELD_WEIGHTS = {"title": 5, "tags": 4, "path": 3, "body": 1}
+
+
+def tokenize(text):
+    return [token.casefold() for token in TOKEN_RE.findall(text or "")]
+
+
+class SearchIndex:
+    """Invertierter Index über Titel, Pfade, Tags und Inhalte der Seiten eines Wikis.
+
+    Seiten lassen sich einzeln aktualisieren; ohne neuen Inhalt bleiben die
+    bisherigen Inhalts-Tokens erhalten.
+    """
+
+    def __init__(self):
+        # token -> {page_id: Gewicht}
+        self._postings = {}
+        # page_id -> {"title", "path", "locale", "tags"}
+        self.pages = {}
+        # page_id -> {token: Gewicht}
+        self._page_tokens = {}
+        # page_id -> Counter der Inhalts-Tokens
+        self._body = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        # Zeitpunkt des letzten vollständigen Aufbaus, 0 = noch nie.
+        self.built_at = 0
+
+    def __len__(self):
+        return len(self.pages)
+
+    def update(self, page, content=None):
+        """Nimmt ``page`` (Felder aus der GraphQL-Liste) neu in den Index auf."""
+        page_id = page["id"]
+        tags = page.get("tags")
+        if tags is None:
+            # Webhook-Ereignisse enthalten keine Tags.
+            tags = self.pages.get(page_id, {}).get("tags", [])
+        self.remove(page_id, keep_body=content is None)
+        if content is not None:
+            self._body[page_id] = Counter(tokenize(content))
+        self.pages[page_id] = {
+            "title": page.get("title") or page["path"],
+            "path": page["path"],
+            "locale": page.get("locale") or "en",
+            "tags": list(tags),
+        }
+        weights = Counter()
+        for token in tokenize(page.get("title")):
+            weights[token] += FIELD_WEIGHTS["title"]
+        for token in tokenize(" ".join(tags)):
+            weights[token] += FIELD_WEIGHTS["tags"]
+        for token in tokenize(page["path"]):
+            weights[token] += FIELD_WEIGHTS["path"]
+        for token, count in self._body.get(page_id, {}).items():
+            # Häufige Wörter einer Seite zählen logarithmisch.
+            weights[token] += FIELD_WEIGHTS["body"] * (1 + math.log(count))
+        self._page_tokens[page_id] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary_dirty = True
+            postings[page_id] = weight
+
+    def remove(self, page_id, keep_body=False):
+        for token in self._page_tokens.pop(page_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(page_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+        self.pages.pop(page_id, None)
+        if not keep_body:
+            self._body.pop(page_id, None)
+
+    def _expand(self, token):
+        """Gibt alle Tokens zurück, die mit ``token`` beginnen."""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, limit=50):
+        """Gibt die IDs der besten Treffer für ``query`` zurück.
+
+        Alle Suchwörter müssen vorkommen; das letzte auch als Wortanfang,
+        damit halb getippte Begriffe schon treffen.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        total = max(len(self.pages), 1)
+        scores = None
+        for i, token in enumerate(tokens):
+            candidates = self._expand(token) if i == len(tokens) - 1 else [token]
+            token_scores = Counter()
+            for candidate in candidates:
+                postings = self._postings.get(candidate, {})
+                idf = math.log(1 + total / (1 + len(postings)))
+                for page_id, weight in postings.items():
+                    token_scores[page_id] += weight * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = Counter({
+                    page_id: score + token_scores[page_id]
+                    for page_id, score in scores.items() if page_id in token_scores
+                })
+            if not scores:
+                return []
+        return [page_id for page_id, _ in scores.most_common(limit)]
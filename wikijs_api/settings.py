@@ -0,0 +1,63 @@
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional
+
+
+@dataclass
+class GuildSettings:
+    """Einstellungen einer Gilde, wie sie in der Config gespeichert sind."""
+
+    channel_id: Optional[int] = None
+    api_key: Optional[str] = None
+    wiki_url: Optional[str] = None
+    # Zuletzt gemeldete Änderung, siehe ``is_newer``.
+    cursor: Optional[dict] = None
+    webhook_secret: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, data):
+        return cls(**{field.name: data.get(field.name) for field in fields(cls)})
+
+    @property
+    def base_url(self):
+        return self.wiki_url.rstrip("/") if self.wiki_url else None
+
+    @property
+    def configured(self):
+        """Ob die Gilde Benachrichtigungen bekommen soll."""
+        return bool(self.channel_id and self.wiki_url)
+
+
+DEFAULT_GUILD = asdict(GuildSettings())
+
+
+class SettingsCache:
+    """Hält die Einstellungen aller Gilden im Speicher.
+
+    Wird einmal beim Laden des Cogs gefüllt; jede Änderung geht über
+    ``set``, das Config und Cache zugleich aktualisiert. Lesen kostet
+    damit keinen Config-Zugriff.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._guilds: Dict[int, GuildSettings] = {}
+
+    async def load(self):
+        self._guilds = {
+            guild_id: GuildSettings.from_config(data)
+            for guild_id, data in (await self.config.all_guilds()).items()
+        }
+
+    def get(self, guild_id) -> GuildSettings:
+        return self._guilds.get(guild_id) or GuildSettings()
+
+    def configured(self) -> List[int]:
+        """Gibt die IDs aller Gilden mit Channel und Wiki-URL zurück."""
+        return [guild_id for guild_id, settings in self._guilds.items() if settings.configured]
+
+    async def set(self, guild_id, **values):
+        settings = self._guilds.setdefault(guild_id, GuildSettings())
+        group = self.config.guild_from_id(guild_id)
+        for name, value in values.items():
+            await group.get_attr(name).set(value)
+            setattr(settings, name, value)
@@ -0,0 +1,142 @@
+from typing import Optional, Sequence
+
+import discord
+from discord.ui import Button, View
+
+# Eine Seite ist ein Dict mit den Schlüsseln ``content`` und/oder ``embeds``,
+# wie beim Paginator-Cog.
+Page = dict
+
+
+class PaginatorButton(Button):
+    def __init__(self, *, emoji=None, label=None):
+        super().__init__(style=discord.ButtonStyle.green, label=label, emoji=emoji)
+
+
+class FirstItemButton(PaginatorButton):
+    def __init__(self):
+        super().__init__(
+            emoji="\N{BLACK LEFT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\N{VARIATION SELECTOR-16}"
+        )
+
+    async def callback(self, interaction: discord.Interaction):
+        self.view.index = 0
+        await self.view.edit_message(interaction)
+
+
+class BackwardButton(PaginatorButton):
+    def __init__(self):
+        super().__init__(emoji="\N{BLACK LEFT-POINTING TRIANGLE}\N{VARIATION SELECTOR-16}")
+
+    async def callback(self, interaction: discord.Interaction):
+        self.view.index = (self.view.index - 1) % len(self.view.contents)
+        await self.view.edit_message(interaction)
+
+
+class PageButton(Button):
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.gray, disabled=True)
+
+    def _change_label(self):
+        self.label = f"Seite {self.view.index + 1}/{len(self.view.contents)}"
+
+
+class ForwardButton(PaginatorButton):
+    def __init__(self):
+        super().__init__(emoji="\N{BLACK RIGHT-POINTING TRIANGLE}\N{VARIATION SELECTOR-16}")
+
+    async def callback(self, interaction: discord.Interaction):
+        self.view.index = (self.view.index + 1) % len(self.view.contents)
+        await self.view.edit_message(interaction)
+
+
+class LastItemButton(PaginatorButton):
+    def __init__(self):
+        super().__init__(
+            emoji="\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\N{VARIATION SELECTOR-16}"
+        )
+
+    async def callback(self, interaction: discord.Interaction):
+        self.view.index = len(self.view.contents) - 1
+        await self.view.edit_message(interaction)
+
+
+class CloseButton(Button):
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.red, label="Schließen", emoji="❎")
+
+    async def callback(self, interaction: discord.Interaction):
+        await self.view.message.delete()
+        self.view.stop()
+
+
+class PaginationView(View):
+    """Blättert durch ``contents`` im Stil des Paginator-Cogs.
+
+    ``contents`` muss nur ``len()`` und Indexzugriff unterstützen; Seiten
+    werden erst beim Anzeigen abgerufen. Ist ``author_id`` gesetzt, darf nur
+    dieser Nutzer blättern und die Nachricht schließen, sonst alle.
+    """
+
+    def __init__(
+        self,
+        contents: Sequence[Page],
+        *,
+        author_id: Optional[int] = None,
+        timeout: int = 180,
+    ):
+        super().__init__(timeout=timeout)
+        self.contents = contents
+        self.author_id = author_id
+        self.index = 0
+        self.message: Optional[discord.Message] = None
+
+        if len(self.contents) > 1:
+            buttons = [BackwardButton, PageButton, ForwardButton]
+            if len(self.contents) > 2:
+                buttons = [FirstItemButton, *buttons, LastItemButton]
+            for btn_cls in buttons:
+                self.add_item(btn_cls())
+        if self.author_id is not None:
+            self.add_item(CloseButton())
+        self.update_items()
+
+    def update_items(self):
+        for item in self.children:
+            if isinstance(item, PageButton):
+                item._change_label()
+            elif isinstance(item, FirstItemButton):
+                item.disabled = self.index == 0
+            elif isinstance(item, LastItemButton):
+                item.disabled = self.index == len(self.contents) - 1
+
+    def current_page(self) -> Page:
+        return self.contents[self.index]
+
+    async def start(self, destination: discord.abc.Messageable, index: int = 0):
+        self.index = index
+        self.update_items()
+        self.message = await destination.send(**self.current_page(), view=self)
+        return self.message
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.author_id is not None and interaction.user.id != self.author_id:
+            await interaction.response.send_message(
+                "Das darfst du nicht bedienen.", ephemeral=True
+            )
+            return False
+        return True
+
+    async def edit_message(self, interaction: discord.Interaction):
+        self.update_items()
+        await interaction.response.edit_message(**self.current_page(), view=self)
+
+    async def on_timeout(self):
+        if self.message:
+            for item in self.children:
+                item.disabled = True
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+        self.stop()
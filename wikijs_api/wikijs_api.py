@@ -1,23 +1,295 @@
 import asyncio
-import aiohttp
+import hmac
+import logging
+import re
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
 import discord
+from aiohttp import web
 from redbot.core import commands, Config
-from discord.ext import tasks
-from datetime import datetime
+
+from redbot.core.data_manager import cog_data_path
+
+from .httpclient import HTTPClient
+from .jobs import JobSupervisor
+from .reader import PageCache, ReaderPages, split_markdown
+from .revisions import NO_BASELINE, RevisionCache
+from .search import SearchIndex
+from .settings import DEFAULT_GUILD, SettingsCache
+from .views import PaginationView
+
+log = logging.getLogger("red.imnic-cogs.wikijs")
+
+# Seiten pro GraphQL-Abfrage; wird verdoppelt, solange alle Treffer neu sind.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+# Höchstens so viele Wikis gleichzeitig abfragen.
+MAX_CONCURRENT_WIKIS = 5
+# Höchstens so viele Seiteninhalte pro Wiki gleichzeitig abrufen.
+MAX_CONCURRENT_CONTENT = 4
+# Abfrageintervall mit und ohne Webhook-Empfänger.
+POLL_MINUTES = 5
+RECONCILE_MINUTES = 60
+# So lange werden Webhook-Ereignisse gesammelt, bevor sie zugestellt werden.
+WEBHOOK_BATCH_DELAY = 2
+# Solange so viele Webhook-Ereignisse warten, wird nicht zusätzlich abgefragt.
+MAX_WEBHOOK_BACKLOG = 100
+# Discord-Grenzen für Embeds.
+MAX_EMBEDS = 10
+MAX_MESSAGE_EMBED_CHARS = 6000
+# Zwei Digest-Embeds dieser Größe passen zusammen in eine Nachricht.
+DIGEST_EMBED_CHARS = 2900
+# Braucht ein Digest mehr Nachrichten, wird er als blätterbare Nachricht gesendet.
+MAX_DIGEST_MESSAGES = 5
+DIGEST_VIEW_TIMEOUT = 60 * 60
+# So viele zugestellte Änderungen merken, um Doppelmeldungen zu vermeiden.
+MAX_DELIVERED = 5000
+# Abfragen ändern nichts am Wiki und dürfen wiederholt werden.
+GRAPHQL_RETRIES = 2
+# Nach dieser Zeit wird der Suchindex bei der nächsten Suche im Hintergrund
+# neu aufgebaut, damit gelöschte Seiten verschwinden.
+SEARCH_INDEX_MAX_AGE = 24 * 60 * 60
+MAX_SEARCH_RESULTS = 50
+SEARCH_RESULTS_PER_PAGE = 10
+# Trennt ein mögliches Sprachkürzel am Anfang eines Seitenpfads ab, z. B. ``de/``.
+LOCALE_RE = re.compile(r"^([a-z]{2}(?:-[a-z]{2})?)/(.+)$", re.IGNORECASE)
+
+CHANGES_QUERY = """
+query ($limit: Int!) {
+  pages {
+    list(limit: $limit, orderBy: UPDATED, orderByDirection: DESC) {
+      id
+      path
+      locale
+      title
+      description
+      tags
+      createdAt
+      updatedAt
+    }
+  }
+}
+"""
+
+
+INDEX_QUERY = """
+query {
+  pages {
+    list {
+      id
+      path
+      locale
+      title
+      tags
+    }
+  }
+}
+"""
+
+
+CONTENT_QUERY = """
+query ($id: Int!) {
+  pages {
+    single(id: $id) {
+      content
+    }
+  }
+}
+"""
+
+
+PAGE_QUERY = """
+query ($path: String!, $locale: String!) {
+  pages {
+    singleByPath(path: $path, locale: $locale) {
+      id
+      title
+      updatedAt
+      content
+    }
+  }
+}
+"""
+
+
+LOCALE_QUERY = """
+query {
+  localization {
+    config {
+      locale
+      namespacing
+      namespaces
+    }
+  }
+}
+"""
+
+
+PAGE_VERSION_QUERY = """
+query ($path: String!, $locale: String!) {
+  pages {
+    singleByPath(path: $path, locale: $locale) {
+      updatedAt
+    }
+  }
+}
+"""
+
+
+def is_newer(page, cursor):
+    """Prüft, ob eine Seite nach dem Cursor geändert wurde.
+
+    Der Cursor besteht aus dem letzten ``updatedAt`` und den IDs der Seiten
+    mit genau diesem Zeitstempel, damit gleichzeitige Änderungen weder
+    doppelt noch gar nicht gemeldet werden.
+    """
+    if page["updatedAt"] != cursor["updated_at"]:
+        return page["updatedAt"] > cursor["updated_at"]
+    return page["id"] not in cursor["ids"]
+
+
+def shared_cursor(cursors):
+    """Gibt den Cursor zurück, ab dem die Änderungen für alle ``cursors`` reichen.
+
+    Das ist der älteste Zeitstempel mit den IDs, die alle Cursor mit genau
+    diesem Zeitstempel gemeinsam haben; ``None`` ohne Cursor.
+    """
+    if not cursors:
+        return None
+    oldest = min(cursor["updated_at"] for cursor in cursors)
+    ids = set.intersection(*(
+        set(cursor["ids"]) for cursor in cursors if cursor["updated_at"] == oldest))
+    return {"updated_at": oldest, "ids": sorted(ids)}
+
+
+def advance_cursor(cursor, pages):
+    """Gibt den Cursor nach der Zustellung von ``pages`` zurück."""
+    newest = max(page["updatedAt"] for page in pages)
+    ids = [page["id"] for page in pages if page["updatedAt"] == newest]
+    if cursor and cursor["updated_at"] == newest:
+        ids = sorted(set(cursor["ids"]) | set(ids))
+    return {"updated_at": newest, "ids": ids}
+
+
+def is_new_page(page):
+    """Ob ``page`` mit dieser Änderung angelegt wurde.
+
+    Wiki.js setzt ``createdAt`` und ``updatedAt`` beim Anlegen getrennt,
+    daher dürfen sie um Sekundenbruchteile auseinanderliegen.
+    """
+    created, updated = page.get("createdAt"), page.get("updatedAt")
+    if not created or not updated:
+        return False
+    try:
+        created, updated = (
+            datetime.fromisoformat(value.replace("Z", "+00:00")) for value in (created, updated))
+    except ValueError:
+        return created == updated
+    return abs((updated - created).total_seconds()) < 1
+
+
+def build_digest(wiki_url, pages):
+    """Fasst ``pages`` zu möglichst wenigen Nachrichten zusammen.
+
+    Jede Änderung wird eine Zeile; Zeilen werden auf Embeds (höchstens
+    ``DIGEST_EMBED_CHARS`` Zeichen Beschreibung) und Embeds auf Nachrichten
+    (höchstens 10 Embeds und 6000 Zeichen) verteilt. Gibt eine Liste von
+    Paaren aus Nachricht (``{"embeds": [...]}``) und den darin gemeldeten
+    Seiten zurück.
+    """
+    lines = []
+    for page in pages:
+        title = page.get("title") or "Unbekannter Artikel"
+        line = f"[{title}]({wiki_url}/{page['locale']}/{page['path']}) \N{EM DASH} `{page['path']}`"
+        diff = page.get("diff")
+        if is_new_page(page):
+            line += " (neu)"
+        elif diff and diff is not NO_BASELINE:
+            line += f" (+{diff['added']}/\N{MINUS SIGN}{diff['removed']})"
+            line += "".join(f"\n> `{sample}`" for sample in diff["samples"])
+        lines.append((line, page))
+
+    title = "WikiJS-Updates"
+    footer = f"{len(pages)} Änderung" + ("en" if len(pages) != 1 else "")
+    descriptions = []
+    description, described = "", []
+    for line, page in lines:
+        line = line[:DIGEST_EMBED_CHARS]
+        if description and len(description) + len(line) + 1 > DIGEST_EMBED_CHARS:
+            descriptions.append((description, described))
+            description, described = "", []
+        description = f"{description}\n{line}" if description else line
+        described.append(page)
+    if description:
+        descriptions.append((description, described))
+
+    messages = []
+    embeds, size, reported = [], 0, []
+    for description, described in descriptions:
+        embed = discord.Embed(title=title, description=description)
+        embed.set_footer(text=footer)
+        if embeds and (len(embeds) == MAX_EMBEDS or size + len(embed) > MAX_MESSAGE_EMBED_CHARS):
+            messages.append(({"embeds": embeds}, reported))
+            embeds, size, reported = [], 0, []
+        embeds.append(embed)
+        size += len(embed)
+        reported.extend(described)
+    if embeds:
+        messages.append(({"embeds": embeds}, reported))
+    return messages
+
+
+def build_search_pages(wiki_url, query, pages):
+    """Verteilt die Suchtreffer ``pages`` auf blätterbare Nachrichten."""
+    messages = []
+    for start in range(0, len(pages), SEARCH_RESULTS_PER_PAGE):
+        lines = []
+        for page in pages[start:start + SEARCH_RESULTS_PER_PAGE]:
+            line = f"[{page['title']}]({wiki_url}/{page['locale']}/{page['path']}) \N{EM DASH} `{page['path']}`"
+            if page["tags"]:
+                line += "\n" + " ".join(f"`#{tag}`" for tag in page["tags"])
+            lines.append(line)
+        embed = discord.Embed(title=f"Suche: {query}"[:256], description="\n".join(lines))
+        embed.set_footer(text=f"{len(pages)} Treffer")
+        messages.append({"embeds": [embed]})
+    return messages
 
 
 class WikiJSCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=self.qualified_name)
-        default_guild = {"channel_id": None, "last_update": None}
-        self.config.register_guild(**default_guild)
-        self.cog_options = {
-            "command_prefix": "wikijs",
-            "db_url": None,
-            "red_context": True,
-            "red_environment": True,
-        }
+        self.config.register_guild(**DEFAULT_GUILD)
+        self.settings = SettingsCache(self.config)
+        self.config.register_global(
+            webhook={"enabled": False, "host": "127.0.0.1", "port": 8742})
+        self._webhook_runner = None
+        self._webhook_queue = asyncio.Queue()
+        self._webhook_worker = None
+        # (guild_id, page_id, updatedAt) bereits zugestellter Änderungen
+        self._delivered = OrderedDict()
+        self.revisions = RevisionCache(str(cog_data_path(self) / "revisions"))
+        # (wiki_url, page_id, updatedAt) -> Ergebnis von RevisionCache.compare,
+        # damit eine Gilde mit älterem Cursor dasselbe Ergebnis bekommt.
+        self._annotations = OrderedDict()
+        # (wiki_url, page_id, updatedAt) -> geänderter Inhalt, der erst nach
+        # der Zustellung an alle Gilden zum neuen Vergleichsstand wird.
+        self._pending_revisions = OrderedDict()
+        # (wiki_url, api_key) -> SearchIndex bzw. laufender Aufbau
+        self.search_indexes = {}
+        self._index_builds = {}
+        # (wiki_url, api_key, locale, path) -> Seite für ``wikijs read``
+        self.page_cache = PageCache()
+        # (wiki_url, api_key) -> (Standardsprache, Sprachen mit eigenem Pfad)
+        self._locales = {}
+        self.http = HTTPClient()
+        self.jobs = JobSupervisor(bot.wait_until_red_ready)
+        self.poll_job = self.jobs.add(
+            "wikijs.poll", self.check_wikijs_changes, POLL_MINUTES * 60,
+            skip_if=lambda: self._webhook_queue.qsize() > MAX_WEBHOOK_BACKLOG)
 
     @commands.group()
     async def wikijs(self, ctx):
@@ -27,58 +299,543 @@ class WikiJSCog(commands.Cog):
     @wikijs.command(name="setchannel")
     async def set_channel(self, ctx, channel: discord.TextChannel):
         """Setzt den Discord-Channel für Benachrichtigungen."""
-        await self.config.guild(ctx.guild).channel_id.set(channel.id)
+        await self.settings.set(ctx.guild.id, channel_id=channel.id)
         await ctx.send(f"Benachrichtigungs-Channel auf {channel.mention} gesetzt.")
 
     @wikijs.command(name="setapikey")
     async def set_api_key(self, ctx, api_key: str):
         """Setzt den API-Schlüssel für die WikiJS-API."""
-        await self.config.guild(ctx.guild).api_key.set(api_key)
+        await self.settings.set(ctx.guild.id, api_key=api_key)
         await ctx.send("API-Schlüssel erfolgreich gesetzt.")
 
     @wikijs.command(name="setwikiurl")
     async def set_wiki_url(self, ctx, wiki_url: str):
         """Setzt die URL der WikiJS-Website."""
-        await self.config.guild(ctx.guild).wiki_url.set(wiki_url)
+        await self.settings.set(ctx.guild.id, wiki_url=wiki_url)
         await ctx.send("Wiki-URL erfolgreich gesetzt.")
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Wird aufgerufen, wenn der Bot bereit ist."""
-        await self.check_wikijs_changes.start()
+    @wikijs.command(name="search")
+    @commands.guild_only()
+    async def search(self, ctx, *, query: str):
+        """Durchsucht Titel, Pfade, Tags und Inhalte der Wiki-Seiten."""
+        settings = self.settings.get(ctx.guild.id)
+        if not settings.wiki_url:
+            await ctx.send("Für diesen Server ist keine Wiki-URL gesetzt.")
+            return
+        wiki_url, api_key = settings.base_url, settings.api_key
+        index = self.search_indexes.get((wiki_url, api_key))
+        if index is None or not index.built_at:
+            try:
+                async with ctx.typing():
+                    index = await self.build_search_index(wiki_url, api_key)
+            except Exception as e:
+                await ctx.send(f"Der Suchindex konnte nicht aufgebaut werden: {e}")
+                return
+        elif time.time() - index.built_at > SEARCH_INDEX_MAX_AGE:
+            # Den alten Index weiter benutzen, bis der neue fertig ist.
+            self.build_search_index(wiki_url, api_key)
+        results = [index.pages[page_id] for page_id in index.search(query, MAX_SEARCH_RESULTS)]
+        if not results:
+            await ctx.send("Keine Treffer.")
+            return
+        pages = build_search_pages(wiki_url, query, results)
+        await PaginationView(pages, author_id=ctx.author.id).start(ctx)
+
+    @wikijs.command(name="read")
+    @commands.guild_only()
+    async def read(self, ctx, path: str):
+        """Zeigt eine Wiki-Seite zum Durchblättern an.
+
+        ``path`` ist der Seitenpfad, optional mit Sprachkürzel (``de/start``).
+        """
+        settings = self.settings.get(ctx.guild.id)
+        if not settings.wiki_url:
+            await ctx.send("Für diesen Server ist keine Wiki-URL gesetzt.")
+            return
+        wiki_url = settings.base_url
+        path = path[len(wiki_url):] if path.startswith(wiki_url) else path
+        path = path.strip("/")
+        try:
+            async with ctx.typing():
+                default, namespaces = await self.wiki_locales(wiki_url, settings.api_key)
+                match = LOCALE_RE.match(path)
+                locale = default
+                if match and match.group(1).lower() in namespaces:
+                    locale, path = match.group(1).lower(), match.group(2)
+                page = await self.fetch_page(wiki_url, settings.api_key, locale, path)
+        except Exception as e:
+            await ctx.send(f"Die Seite konnte nicht abgerufen werden: {e}")
+            return
+        if page is None:
+            await ctx.send("Diese Seite gibt es nicht.")
+            return
+        if "chunks" not in page:
+            page["chunks"] = split_markdown(page["content"]) or ["*(leer)*"]
+        pages = ReaderPages(page["title"] or path, f"{wiki_url}/{locale}/{path}", page["chunks"])
+        await PaginationView(pages, author_id=ctx.author.id).start(ctx)
+
+    @wikijs.group(name="webhook", invoke_without_command=True)
+    @commands.is_owner()
+    async def webhook(self, ctx):
+        """Verwaltet den Webhook-Empfänger für Wiki.js-Seitenereignisse."""
+        await ctx.send_help()
+
+    @webhook.command(name="enable")
+    async def webhook_enable(self, ctx, port: int = 8742, host: str = "127.0.0.1"):
+        """Startet den Webhook-Empfänger auf ``host``:``port``.
+
+        Solange er läuft, wird das Wiki nur noch stündlich zum Abgleich
+        abgefragt.
+        """
+        await self.config.webhook.set({"enabled": True, "host": host, "port": port})
+        await self.stop_webhook_server()
+        try:
+            await self.start_webhook_server()
+        except OSError as e:
+            await self.config.webhook.enabled.set(False)
+            await ctx.send(f"Webhook-Empfänger konnte nicht gestartet werden: {e}")
+            return
+        await ctx.send(
+            f"Webhook-Empfänger läuft auf `{host}:{port}`. "
+            f"Ereignisse an `POST /wikijs/<guild_id>` senden."
+        )
+
+    @webhook.command(name="disable")
+    async def webhook_disable(self, ctx):
+        """Stoppt den Webhook-Empfänger und fragt wieder alle 5 Minuten ab."""
+        await self.config.webhook.enabled.set(False)
+        await self.stop_webhook_server()
+        await ctx.send("Webhook-Empfänger gestoppt.")
+
+    @wikijs.command(name="webhooksecret")
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    async def webhook_secret(self, ctx):
+        """Erzeugt ein neues Webhook-Geheimnis für diesen Server und schickt es per DM."""
+        secret = secrets.token_urlsafe(32)
+        await self.settings.set(ctx.guild.id, webhook_secret=secret)
+        try:
+            await ctx.author.send(
+                f"Webhook für **{ctx.guild.name}**: `POST /wikijs/{ctx.guild.id}` "
+                f"mit dem Header `X-WikiJS-Secret: {secret}`."
+            )
+        except discord.Forbidden:
+            await ctx.send("Ich kann dir keine DM schicken; das Geheimnis wurde nicht angezeigt.")
+            return
+        await ctx.send("Neues Webhook-Geheimnis per DM verschickt.")
+
+    async def cog_load(self):
+        await self.settings.load()
+        if await self.config.webhook.enabled():
+            try:
+                await self.start_webhook_server()
+            except OSError as e:
+                log.warning("Webhook-Empfänger konnte nicht gestartet werden: %s", e)
+        # Die Abfrage wartet selbst, bis der Bot bereit ist.
+        self.jobs.start()
+
+    async def cog_unload(self):
+        await self.jobs.close()
+        for task in self._index_builds.values():
+            task.cancel()
+        await self.stop_webhook_server()
+        await self.http.close()
+
+    async def start_webhook_server(self):
+        settings = await self.config.webhook()
+        app = web.Application()
+        app.router.add_post("/wikijs/{guild_id}", self.handle_webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, settings["host"], settings["port"]).start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self._webhook_runner = runner
+        if self._webhook_worker is None or self._webhook_worker.done():
+            self._webhook_worker = asyncio.create_task(self.process_webhook_events())
+        self.poll_job.set_interval(RECONCILE_MINUTES * 60)
+
+    async def stop_webhook_server(self):
+        if self._webhook_worker is not None:
+            self._webhook_worker.cancel()
+            self._webhook_worker = None
+        if self._webhook_runner is not None:
+            await self._webhook_runner.cleanup()
+            self._webhook_runner = None
+        self.poll_job.set_interval(POLL_MINUTES * 60)
+
+    async def handle_webhook(self, request):
+        """Nimmt ein Seitenereignis an, prüft das Geheimnis und reiht es ein.
+
+        Erwartet JSON mit den Seitenfeldern ``id``, ``path`` und optional
+        ``locale``, ``title``, ``createdAt`` und ``updatedAt``, direkt oder
+        unter ``page``.
+        """
+        try:
+            guild_id = int(request.match_info["guild_id"])
+        except ValueError:
+            raise web.HTTPNotFound()
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            raise web.HTTPNotFound()
+        expected = self.settings.get(guild.id).webhook_secret
+        given = request.headers.get("X-WikiJS-Secret", "")
+        if not expected or not hmac.compare_digest(given.encode(), expected.encode()):
+            raise web.HTTPUnauthorized()
+        try:
+            payload = await request.json()
+            page = payload.get("page", payload)
+            page = {
+                "id": int(page["id"]),
+                "path": str(page["path"]),
+                "locale": page.get("locale") or "en",
+                "title": page.get("title"),
+                "createdAt": page.get("createdAt"),
+                "updatedAt": page.get("updatedAt") or datetime.now(timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            }
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise web.HTTPBadRequest()
+        self._webhook_queue.put_nowait((guild, page))
+        return web.Response(status=202)
+
+    async def process_webhook_events(self):
+        """Stellt eingereihte Webhook-Ereignisse gebündelt zu."""
+        while True:
+            events = [await self._webhook_queue.get()]
+            await asyncio.sleep(WEBHOOK_BATCH_DELAY)
+            while not self._webhook_queue.empty():
+                events.append(self._webhook_queue.get_nowait())
+            by_guild = {}
+            for guild, page in events:
+                # Mehrere Ereignisse zur selben Seite zusammenfassen.
+                by_guild.setdefault(guild, {})[(page["id"], page["updatedAt"])] = page
+            for guild, pages in by_guild.items():
+                settings = self.settings.get(guild.id)
+                if not settings.configured:
+                    continue
+                wiki_url = settings.base_url
+                pages = sorted(pages.values(), key=lambda page: page["updatedAt"])
+                try:
+                    await self.annotate_changes(wiki_url, settings.api_key, pages)
+                    await self.deliver(guild, settings, wiki_url, pages, advance=False)
+                except Exception:
+                    log.exception("Fehler beim Zustellen von Webhook-Ereignissen")
+
+    def _was_delivered(self, guild, page):
+        return (guild.id, page["id"], page["updatedAt"]) in self._delivered
+
+    def _mark_delivered(self, guild, page):
+        self._delivered[(guild.id, page["id"], page["updatedAt"])] = None
+        while len(self._delivered) > MAX_DELIVERED:
+            self._delivered.popitem(last=False)
+
+    async def graphql(self, wiki_url, api_key, query, variables=None):
+        """Schickt eine Abfrage über den gemeinsamen HTTP-Client und gibt die Antwort zurück."""
+        response = await self.http.request(
+            "POST", f"{wiki_url}/graphql",
+            json={"query": query, "variables": variables or {}},
+            headers={"Authorization": f"Bearer {api_key}"},
+            retries=GRAPHQL_RETRIES,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_changes(self, wiki_url, api_key, cursor):
+        """Holt alle Seiten, die seit ``cursor`` geändert wurden.
+
+        Die Wiki.js-GraphQL-API kennt weder einen Zeitfilter noch Offsets,
+        daher wird nach ``updatedAt`` absteigend sortiert abgefragt und das
+        Limit verdoppelt, bis eine bereits bekannte Seite erreicht ist,
+        höchstens bis ``MAX_PAGE_SIZE``; darüber hinaus wird gewarnt.
+        Ohne Cursor wird nur die neueste Seite geholt, um einen Startpunkt
+        zu setzen. Gibt die neuen Seiten in chronologischer Reihenfolge
+        zurück.
+        """
+        limit = PAGE_SIZE if cursor else 1
+        while True:
+            data = await self.graphql(wiki_url, api_key, CHANGES_QUERY, {"limit": limit})
+            if data.get("errors"):
+                raise RuntimeError(data["errors"][0].get("message", "GraphQL-Fehler"))
+            pages = data["data"]["pages"]["list"]
+            if not cursor:
+                return pages
+            new = [page for page in pages if is_newer(page, cursor)]
+            if len(new) == len(pages) == limit >= MAX_PAGE_SIZE:
+                # Ohne Zeitfilter oder Offset lassen sich ältere Änderungen
+                # nicht nachladen; sie fehlen in der Meldung.
+                log.warning(
+                    "Mehr als %d Änderungen in %s seit %s; ältere werden nicht gemeldet.",
+                    limit, wiki_url, cursor["updated_at"])
+            if len(new) < len(pages) or len(pages) < limit or limit >= MAX_PAGE_SIZE:
+                return sorted(new, key=lambda page: page["updatedAt"])
+            limit *= 2
+
+    async def fetch_content(self, wiki_url, api_key, page_id):
+        """Holt den Quelltext einer Seite."""
+        data = await self.graphql(wiki_url, api_key, CONTENT_QUERY, {"id": page_id})
+        return data["data"]["pages"]["single"]["content"] or ""
+
+    async def wiki_locales(self, wiki_url, api_key):
+        """Gibt die Standardsprache des Wikis und die Sprachen mit eigenem Pfadpräfix zurück.
+
+        Ohne Namespacing hat keine Sprache ein Präfix; ein führendes
+        ``xx/`` gehört dann zum Seitenpfad.
+        """
+        key = (wiki_url, api_key)
+        if key not in self._locales:
+            data = await self.graphql(wiki_url, api_key, LOCALE_QUERY)
+            if data.get("errors"):
+                raise RuntimeError(data["errors"][0].get("message", "GraphQL-Fehler"))
+            config = data["data"]["localization"]["config"]
+            default = config.get("locale") or "en"
+            namespaces = set()
+            if config.get("namespacing"):
+                namespaces = {default, *(config.get("namespaces") or [])}
+            self._locales[key] = (default, namespaces)
+        return self._locales[key]
+
+    async def fetch_page(self, wiki_url, api_key, locale, path):
+        """Gibt Titel und Inhalt einer Seite zurück, möglichst aus dem Cache.
+
+        Nach Ablauf der Cache-Zeit wird nur ``updatedAt`` abgefragt und der
+        Inhalt erst neu geholt, wenn sich die Seite geändert hat. Gibt
+        ``None`` zurück, wenn es die Seite nicht gibt.
+        """
+        key = (wiki_url, api_key, locale, path)
+        cached, fresh = self.page_cache.get(key)
+        if fresh:
+            return cached
+        variables = {"path": path, "locale": locale}
+        if cached is not None:
+            page = await self._query_page(wiki_url, api_key, PAGE_VERSION_QUERY, variables)
+            if page is not None and page["updatedAt"] == cached["updatedAt"]:
+                self.page_cache.touch(key)
+                return cached
+        page = await self._query_page(wiki_url, api_key, PAGE_QUERY, variables)
+        if page is None:
+            self.page_cache.discard(key)
+            return None
+        page["content"] = page["content"] or ""
+        self.page_cache.put(key, page)
+        return page
+
+    async def _query_page(self, wiki_url, api_key, query, variables):
+        data = await self.graphql(wiki_url, api_key, query, variables)
+        page = ((data.get("data") or {}).get("pages") or {}).get("singleByPath")
+        if page is None and data.get("errors"):
+            message = data["errors"][0].get("message", "GraphQL-Fehler")
+            # Wiki.js meldet fehlende Seiten als Fehler.
+            if "not exist" not in message:
+                raise RuntimeError(message)
+        return page
+
+    def build_search_index(self, wiki_url, api_key):
+        """Startet den vollständigen Aufbau des Suchindex eines Wikis.
+
+        Gibt die laufende Aufgabe zurück; gleichzeitige Aufrufe teilen sie
+        sich. Danach wird der Index nur noch von ``annotate_changes``
+        aktualisiert.
+        """
+        key = (wiki_url, api_key)
+        task = self._index_builds.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build_search_index(wiki_url, api_key))
+            self._index_builds[key] = task
+
+            def done(task):
+                self._index_builds.pop(key, None)
+                if not task.cancelled() and task.exception():
+                    log.error("Fehler beim Aufbau des Suchindex für %s", wiki_url, exc_info=task.exception())
+
+            task.add_done_callback(done)
+        return task
+
+    async def _build_search_index(self, wiki_url, api_key):
+        index = SearchIndex()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CONTENT)
+        data = await self.graphql(wiki_url, api_key, INDEX_QUERY)
+        if data.get("errors"):
+            raise RuntimeError(data["errors"][0].get("message", "GraphQL-Fehler"))
+
+        async def add(page):
+            async with semaphore:
+                try:
+                    content = await self.fetch_content(wiki_url, api_key, page["id"])
+                except Exception as e:
+                    log.warning("Inhalt von %s/%s nicht abrufbar: %s", wiki_url, page["path"], e)
+                    content = None
+            index.update(page, content)
+
+        await asyncio.gather(*(add(page) for page in data["data"]["pages"]["list"]))
+        index.built_at = time.time()
+        self.search_indexes[(wiki_url, api_key)] = index
+        return index
+
+    async def annotate_changes(self, wiki_url, api_key, pages):
+        """Prüft per Inhalts-Hash, welche Seiten sich wirklich geändert haben.
+
+        Wiki.js setzt ``updatedAt`` auch bei Speichern ohne Änderung neu.
+        Solche Seiten bekommen ``changed = False``; echte Änderungen ein
+        ``diff`` (siehe ``RevisionCache.compare``). Hash-Vergleich und Diff
+        laufen in einem Worker-Thread. Der neue Inhalt bleibt vorgemerkt, bis
+        ``commit_revisions`` ihn übernimmt. Ein vorhandener Suchindex des
+        Wikis wird mit dem abgerufenen Inhalt aktualisiert.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CONTENT)
+        loop = asyncio.get_running_loop()
+        index = self.search_indexes.get((wiki_url, api_key))
+
+        async def annotate(page):
+            memo_key = (wiki_url, page["id"], page["updatedAt"])
+            if memo_key in self._annotations:
+                diff = self._annotations[memo_key]
+                page["changed"] = diff is not None
+                page["diff"] = diff
+                return
+            async with semaphore:
+                try:
+                    content = await self.fetch_content(wiki_url, api_key, page["id"])
+                except Exception as e:
+                    # Im Zweifel melden.
+                    log.warning("Inhalt von %s/%s nicht abrufbar: %s", wiki_url, page["path"], e)
+                    return
+            if index is not None:
+                index.update(page, content)
+            diff = await loop.run_in_executor(
+                None, self.revisions.compare, wiki_url, page["id"], content)
+            if diff is not None:
+                self.page_cache.discard((wiki_url, api_key, page["locale"], page["path"]))
+                self._pending_revisions[memo_key] = content
+                while len(self._pending_revisions) > MAX_DELIVERED:
+                    self._pending_revisions.popitem(last=False)
+            page["changed"] = diff is not None
+            page["diff"] = diff
+            self._annotations[memo_key] = diff
+            while len(self._annotations) > MAX_DELIVERED:
+                self._annotations.popitem(last=False)
+
+        await asyncio.gather(*(annotate(page) for page in pages))
+
+    async def commit_revisions(self, wiki_url, pages):
+        """Übernimmt den vorgemerkten Inhalt von ``pages`` als Vergleichsstand.
+
+        Erst danach gilt eine Änderung als gemeldet: Schlägt die Zustellung
+        fehl und wird der Cog neu geladen, findet der Hash-Vergleich sie
+        wieder.
+        """
+        contents = []
+        for page in pages:
+            content = self._pending_revisions.pop((wiki_url, page["id"], page["updatedAt"]), None)
+            if content is not None:
+                contents.append((page["id"], content))
+        if not contents:
+            return
+
+        def commit():
+            for page_id, content in contents:
+                self.revisions.store(wiki_url, page_id, content)
+            if self.revisions.dirty:
+                self.revisions.save()
+
+        await asyncio.get_running_loop().run_in_executor(None, commit)
 
-    @tasks.loop(minutes=5)
     async def check_wikijs_changes(self):
-        print("Loop check_wikijs_changes aufgerufen")
-        api_key = await self.config.user(self.bot.user).api_key()
-        wiki_url = await self.config.user(self.bot.user).wiki_url()
-        guild = self.bot.guilds[0]
-        channel_id = await self.config.guild(guild).channel_id()
-        last_update = await self.config.guild(guild).last_update()
-
-        if channel_id is None or last_update is None:
+        """Fragt alle eingerichteten Wikis ab.
+
+        Gilden mit derselben Wiki-URL und demselben API-Schlüssel teilen
+        sich eine Abfrage pro Durchlauf; höchstens ``MAX_CONCURRENT_WIKIS``
+        Wikis werden gleichzeitig abgefragt.
+        """
+        wikis = {}
+        for guild_id in self.settings.configured():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            settings = self.settings.get(guild_id)
+            key = (settings.base_url, settings.api_key)
+            wikis.setdefault(key, []).append((guild, settings))
+
+        if not wikis:
             return
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WIKIS)
 
-        channel = guild.get_channel(channel_id)
-        if not channel:
+        async def poll(wiki_url, api_key, guilds):
+            async with semaphore:
+                await self.poll_wiki(wiki_url, api_key, guilds)
+
+        await asyncio.gather(*(
+            poll(wiki_url, api_key, guilds) for (wiki_url, api_key), guilds in wikis.items()))
+
+    async def poll_wiki(self, wiki_url, api_key, guilds):
+        """Holt die Änderungen eines Wikis einmal und verteilt sie an ``guilds``."""
+        tracked = [(guild, settings) for guild, settings in guilds if settings.cursor]
+        fresh = [guild for guild, settings in guilds if not settings.cursor]
+        # Ab dem ältesten Cursor abfragen; jede Gilde filtert danach selbst.
+        shared = shared_cursor([settings.cursor for _, settings in tracked])
+        try:
+            pages = await self.fetch_changes(wiki_url, api_key, shared)
+        except Exception as e:
+            log.warning("Fehler bei der API-Anfrage an %s: %s", wiki_url, e)
+            return
+        # Neu eingerichtete Gilden beginnen beim aktuellen Stand des Wikis.
+        start = advance_cursor(shared, pages) if pages else shared
+        if start is not None:
+            for guild in fresh:
+                await self.settings.set(guild.id, cursor=start)
+        if not tracked or not pages:
             return
+        await self.annotate_changes(wiki_url, api_key, pages)
+        delivered = await asyncio.gather(*(
+            self.deliver(guild, settings, wiki_url, pages) for guild, settings in tracked))
+        if all(delivered):
+            await self.commit_revisions(wiki_url, pages)
+
+    async def deliver(self, guild, settings, wiki_url, pages, advance=True):
+        """Meldet ``guild`` alle Seiten, die neuer als ihr Cursor sind.
 
-        # Führe eine API-Anfrage an WikiJS durch
-        async with aiohttp.ClientSession() as session:
+        Bereits per Webhook gemeldete Seiten werden übersprungen. Mit
+        ``advance=False`` (Webhook-Zustellung) bleibt der Cursor stehen,
+        damit der Abgleich verpasste Ereignisse noch findet. Gibt ``False``
+        zurück, wenn das Senden fehlschlug, sonst ``True``.
+        """
+        cursor = settings.cursor
+        if cursor is None:
+            # Den Startpunkt setzt erst ``poll_wiki``.
+            return True
+        pages = [page for page in pages if is_newer(page, cursor)]
+        if not pages:
+            return True
+        channel = guild.get_channel(settings.channel_id)
+        if not channel:
+            return True
+        new = [
+            page for page in pages
+            if page.get("changed", True) and not self._was_delivered(guild, page)
+        ]
+        if new:
+            messages = build_digest(wiki_url, new)
             try:
-                async with session.get(f"{wiki_url}/api/recent-changes?api_key={api_key}") as response:
-                    data = await response.json()
-                    # Verarbeite die API-Antwort und erstelle ein Embed
-                    # Beispiel: Extrahiere die neuesten Änderungen und erstelle ein Embed
-                    changes = data.get("changes", [])
-                    if changes:
-                        embed = discord.Embed(
-                            title="WikiJS-Updates", description="Hier sind die neuesten Änderungen:")
-                        for change in changes:
-                            title = change.get("title", "Unbekannter Artikel")
-                            await channel.send(embed=embed)
-            except Exception as e:
-                print(f"Fehler bei der API-Anfrage: {e}")
+                if len(messages) <= MAX_DIGEST_MESSAGES:
+                    for message, reported in messages:
+                        await channel.send(**message)
+                        # Schon gesendete Nachrichten beim nächsten Versuch auslassen.
+                        for page in reported:
+                            self._mark_delivered(guild, page)
+                else:
+                    # Überlauf: eine Nachricht zum Durchblättern statt vieler.
+                    digest = [message for message, _ in messages]
+                    await PaginationView(digest, timeout=DIGEST_VIEW_TIMEOUT).start(channel)
+                    for page in new:
+                        self._mark_delivered(guild, page)
+            except discord.HTTPException as e:
+                # Cursor nicht weiterschieben, damit nichts verloren geht.
+                log.warning("Fehler beim Senden in %s: %s", guild.name, e)
+                return False
 
-        # Speichere das aktuelle Datum als letztes Update
-        await self.config.guild(guild).last_update.set(str(datetime.now()))
+        # Erst nach erfolgreicher Zustellung weiterschieben.
+        if advance:
+            await self.settings.set(guild.id, cursor=advance_cursor(cursor, pages))
+        return True